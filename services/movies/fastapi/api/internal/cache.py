@@ -0,0 +1,69 @@
+from core.bloom import uuid_filters
+from core.cache import (
+    AbstractCacheService,
+    get_cache_service,
+    invalidation_tags,
+)
+from core.edge import purge_edge
+from core.metrics import metrics
+from core.ttl_policy import ttl_policy
+from schemas.cache import (
+    CacheInvalidation,
+    CacheInvalidationResult,
+    CacheTTLClass,
+)
+
+from fastapi import APIRouter, Depends
+
+router = APIRouter()
+
+
+@router.get(
+    "/stats",
+    summary="Статистика кэша",
+    description="Счётчики попаданий и промахов по уровням кэша "
+    "для текущего воркера",
+)
+async def cache_stats() -> dict[str, float]:
+    """Выдает счётчики кэша воркера, обработавшего запрос."""
+    return metrics.snapshot()
+
+
+@router.get(
+    "/ttl",
+    summary="Политика TTL кэша",
+    description="TTL из таблицы настроек и действующий TTL по классам "
+    "ключей (эндпоинтам и индексам) из таблицы и уже обслуженным текущим "
+    "воркером, со счетчиками, по которым TTL подстраивается",
+)
+async def cache_ttl_policy() -> list[CacheTTLClass]:
+    """Выдает действующую политику TTL воркера, обработавшего запрос."""
+    return [CacheTTLClass(**row) for row in ttl_policy.describe()]
+
+
+@router.post(
+    "/invalidate",
+    summary="Инвалидация кэша",
+    description="Удаляет записи кэша, зависящие от измененных документов "
+    "индекса (вместе со всеми списками индекса), или все записи индекса, "
+    "и рассылает purge тех же ответов прокси",
+)
+async def cache_invalidate(
+    invalidation: CacheInvalidation,
+    cache: AbstractCacheService = Depends(get_cache_service),
+) -> CacheInvalidationResult:
+    """Удаляет зависимые записи кэша одной атомарной операцией в Redis,
+    затем ответы на прокси: иначе прокси мог бы снова получить ответ
+    из еще не очищенного кэша.
+    """
+    deleted = await cache.invalidate(
+        index=invalidation.index, uuids=invalidation.uuids
+    )
+    if invalidation.uuids:
+        # новые документы иначе отдают 404 до перестройки фильтра
+        uuid_filters.add(invalidation.index, invalidation.uuids)
+    await ttl_policy.record_change(invalidation.index)
+    purged = await purge_edge(
+        invalidation_tags(invalidation.index, invalidation.uuids)
+    )
+    return CacheInvalidationResult(deleted=deleted, purged=purged)
@@ -0,0 +1,32 @@
+from core.edge import local_purger, purge_edge
+from schemas.edge import EdgePurge, EdgePurgeResult
+
+from fastapi import APIRouter
+
+router = APIRouter()
+
+
+@router.post(
+    "/purge",
+    summary="Purge ответов на прокси",
+    description="Рассылает прокси из EDGE_PURGE_URLS удаление ответов "
+    "по индексам или UUID документов (заголовок Surrogate-Key)",
+)
+async def edge_purge(purge: EdgePurge) -> EdgePurgeResult:
+    """Удаляет с прокси ответы с тегами индексов и документов."""
+    keys = [
+        *(f"index:{index}" for index in purge.indexes),
+        *(f"doc:{uuid}" for uuid in purge.uuids),
+    ]
+    return EdgePurgeResult(keys=keys, purged=await purge_edge(keys))
+
+
+@router.get(
+    "/local",
+    summary="Purge локальной заглушки прокси",
+    description="Наборы тегов, полученные заглушкой local из "
+    "EDGE_PURGE_URLS текущего воркера, от старых к новым",
+)
+async def edge_local_history() -> list[list[str]]:
+    """Выдает историю purge локальной заглушки прокси."""
+    return list(local_purger.history)
@@ -5,13 +5,18 @@ from core.config import settings
 from core.enum import (
     APICommonDescription,
     APIFilmAdvancedSearchDescription,
+    APIFilmBatchDescription,
     APIFilmByUUIDDescription,
+    APIFilmExportDescription,
     APIFilmMainDescription,
     APIFilmSearchDescription,
     ErrorMessage,
 )
+from core.export import export_response
+from core.response_cache import CachedResponseRoute
 from core.service import CommonService
 from models.film import Film, FilmShort
+from schemas.batch import UUIDBatch
 from services.film import FilmService, get_film_service
 
 from fastapi import (
@@ -23,8 +28,9 @@ from fastapi import (
     Query,
     Request,
 )
+from fastapi.responses import StreamingResponse
 
-router = APIRouter()
+router = APIRouter(route_class=CachedResponseRoute)
 
 
 @router.get(
@@ -44,7 +50,9 @@ async def film_short_list(
         settings.STANDART_PAGE_SIZE,
         description=APICommonDescription.page_size,
         ge=1,
+        le=settings.MAX_PAGE_SIZE,
     ),
+    cursor: str = Query(None, description=APICommonDescription.cursor),
     service: CommonService = Depends(get_film_service),
 ) -> list[FilmShort]:
     """
@@ -53,6 +61,7 @@ async def film_short_list(
     :param query: Строка запроса для поиска фильмов.
     :param page_number: Номер страницы (начиная с 1).
     :param page_size: Количество элементов на странице.
+    :param cursor: Курсор следующей страницы из заголовка X-Next-Cursor.
     """
     matches = {"title": query} if query else None
     films = await service.get_list(
@@ -61,6 +70,7 @@ async def film_short_list(
         matches=matches,
         bool_operator="must",
         request=request,
+        cursor=cursor,
     )
     if not films:
         raise HTTPException(
@@ -70,6 +80,27 @@ async def film_short_list(
     return films
 
 
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary=APIFilmExportDescription.summary,
+    description=APIFilmExportDescription.description,
+    response_description=APIFilmExportDescription.response_description,
+)
+async def film_export(
+    request: Request,
+    fields: str = Query(None, description=APICommonDescription.fields),
+    service: CommonService = Depends(get_film_service),
+) -> StreamingResponse:
+    """
+    Выгрузка всех кинопроизведений из elasticsearch в формате NDJSON.
+
+    :param fields: Поля документов через запятую (по умолчанию все).
+    """
+    batches = service.export(fields.split(",") if fields else None)
+    return export_response(request, batches, service.index)
+
+
 @router.get(
     "/{uuid}",
     response_model=Film,
@@ -111,11 +142,13 @@ async def film_list(
         settings.STANDART_PAGE_SIZE,
         description=APICommonDescription.page_size,
         ge=1,
+        le=settings.MAX_PAGE_SIZE,
     ),
     sort: str = Query("-imdb_rating", description=APICommonDescription.sort),
     genre_uuid: UUID = Query(
         None, description="Фильтр фильмов по uuid жанра", alias="genre"
     ),
+    cursor: str = Query(None, description=APICommonDescription.cursor),
     service: CommonService = Depends(get_film_service),
 ) -> list[FilmShort]:
     """
@@ -125,6 +158,7 @@ async def film_list(
     :param page_size: Количество элементов на странице.
     :param sort: Поле для сортировки (например, imdb_rating).
     :param genre: Фильтр фильмов по id жанра.
+    :param cursor: Курсор следующей страницы из заголовка X-Next-Cursor.
     """
     nested_matches = {"genre.uuid": genre_uuid} if genre_uuid else None
     films = await service.get_list(
@@ -134,6 +168,7 @@ async def film_list(
         nested_matches=nested_matches,
         bool_operator="must",
         request=request,
+        cursor=cursor,
     )
     if not films:
         raise HTTPException(
@@ -144,6 +179,32 @@ async def film_list(
     return films
 
 
+@router.post(
+    "/batch",
+    response_model=list[Film],
+    summary=APIFilmBatchDescription.summary,
+    description=APIFilmBatchDescription.description,
+    response_description=APIFilmBatchDescription.response_description,
+)
+async def film_batch(
+    request: Request,
+    batch: UUIDBatch,
+    service: CommonService = Depends(get_film_service),
+) -> list[Film]:
+    """
+    Выдает информацию из elasticsearch (или из кэша redis)
+    о кинопроизведениях по списку uuid в порядке списка.
+    Ненайденные кинопроизведения пропускаются.
+    """
+    films = await service.get_many_by_uuids(batch.uuids, request=request)
+    if not films:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=ErrorMessage.films_not_found,
+        )
+    return films
+
+
 @router.post(
     "/advanced_search",
     response_model=list[Film],
@@ -160,6 +221,7 @@ async def advanced_search_films(
         1,
         description=APICommonDescription.page_size,
         ge=1,
+        le=settings.MAX_PAGE_SIZE,
     ),
     sort: str = Query("-imdb_rating", description=APICommonDescription.sort),
     search_query: dict = Body(
@@ -4,15 +4,18 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Path, Request
 
 from core.enum import (
+    APIGenreBatchDescription,
     APIGenreByUUIDDescription,
     APIGenreMainDescription,
     ErrorMessage,
 )
+from core.response_cache import CachedResponseRoute
 from core.service import CommonService
 from models.genre import GenreShort
+from schemas.batch import UUIDBatch
 from services.genre import get_genre_service
 
-router = APIRouter()
+router = APIRouter(route_class=CachedResponseRoute)
 
 
 @router.get(
@@ -66,3 +69,30 @@ async def genre_list(
             detail=ErrorMessage.genres_not_found,
         )
     return genres
+
+
+@router.post(
+    "/batch",
+    response_model=list[GenreShort],
+    summary=APIGenreBatchDescription.summary,
+    description=APIGenreBatchDescription.description,
+    response_description=APIGenreBatchDescription.response_description,
+)
+async def genre_batch(
+    request: Request,
+    batch: UUIDBatch,
+    service: CommonService = Depends(get_genre_service),
+) -> list[GenreShort]:
+    """
+    Выдает информацию из elasticsearch (или из кэша redis)
+    по жанрам из списка uuid в порядке списка
+
+    :param batch: список uuid жанров
+    """
+    genres = await service.get_many_by_uuids(batch.uuids, request=request)
+    if not genres:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=ErrorMessage.genres_not_found,
+        )
+    return genres
@@ -5,11 +5,15 @@ from core.config import settings
 from core.enum import (
     APICommonDescription,
     APIPersonAdvancedSearchDescription,
+    APIPersonBatchDescription,
     APIPersonByUUIDDescription,
+    APIPersonExportDescription,
     APIPersonFilmsByUUID,
     APIPersonSearchDescription,
     ErrorMessage,
 )
+from core.export import export_response
+from core.response_cache import CachedResponseRoute
 from core.service import CommonService
 from fastapi import (
     APIRouter,
@@ -20,10 +24,12 @@ from fastapi import (
     Query,
     Request,
 )
+from fastapi.responses import StreamingResponse
 from models.person import InnerPersonFilmsByUUID, Person, PersonFilms
+from schemas.batch import UUIDBatch
 from services.person import PersonService, get_person_service
 
-router = APIRouter()
+router = APIRouter(route_class=CachedResponseRoute)
 
 
 @router.get(
@@ -43,7 +49,9 @@ async def person_search(
         settings.STANDART_PAGE_SIZE,
         description=APICommonDescription.page_size,
         ge=1,
+        le=settings.MAX_PAGE_SIZE,
     ),
+    cursor: str = Query(None, description=APICommonDescription.cursor),
     service: CommonService = Depends(get_person_service),
 ) -> list[PersonFilms]:
     """
@@ -52,6 +60,7 @@ async def person_search(
     :param page_number: Номер страницы (начиная с 1).
     :param page_size: Количество элементов на странице.
     :param query: Строка для поиска по имени персоны
+    :param cursor: Курсор следующей страницы из заголовка X-Next-Cursor.
     """
     matches = {"full_name": query} if query else None
     persons = await service.get_list(
@@ -59,6 +68,7 @@ async def person_search(
         request=request,
         page_number=page_number,
         page_size=page_size,
+        cursor=cursor,
     )
     if not persons:
         raise HTTPException(
@@ -68,6 +78,27 @@ async def person_search(
     return persons
 
 
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    summary=APIPersonExportDescription.summary,
+    description=APIPersonExportDescription.description,
+    response_description=APIPersonExportDescription.response_description,
+)
+async def person_export(
+    request: Request,
+    fields: str = Query(None, description=APICommonDescription.fields),
+    service: CommonService = Depends(get_person_service),
+) -> StreamingResponse:
+    """
+    Выгрузка всех персон из elasticsearch в формате NDJSON.
+
+    :param fields: Поля документов через запятую (по умолчанию все).
+    """
+    batches = service.export(fields.split(",") if fields else None)
+    return export_response(request, batches, service.index)
+
+
 @router.get(
     "/{uuid}",
     response_model=PersonFilms,
@@ -110,6 +141,32 @@ async def person_films(
     return person.films
 
 
+@router.post(
+    "/batch",
+    response_model=list[PersonFilms],
+    summary=APIPersonBatchDescription.summary,
+    description=APIPersonBatchDescription.description,
+    response_description=APIPersonBatchDescription.response_description,
+)
+async def person_batch(
+    request: Request,
+    batch: UUIDBatch,
+    service: CommonService = Depends(get_person_service),
+) -> list[PersonFilms]:
+    """
+    Выдает информацию из elasticsearch (или из кэша redis)
+    о персонах и их фильмах по списку uuid в порядке списка.
+    Ненайденные персоны пропускаются.
+    """
+    persons = await service.get_many_by_uuids(batch.uuids, request=request)
+    if not persons:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND,
+            detail=ErrorMessage.persons_not_found,
+        )
+    return persons
+
+
 @router.post(
     "/advanced_search",
     response_model=list[Person],
@@ -126,6 +183,7 @@ async def advanced_search_persons(
         1,
         description=APICommonDescription.page_size,
         ge=1,
+        le=settings.MAX_PAGE_SIZE,
     ),
     search_query: dict = Body(
         None,
@@ -0,0 +1,104 @@
+"""Микробенчмарк кодеков кэша.
+
+Сравнивает стоимость попадания в кэш (десериализация значения в модели)
+и записи в кэш для страницы из 50 FilmShort и для полных Film,
+а также экономию памяти и добавочную стоимость попадания при сжатии.
+
+Запуск из папки fastapi:
+    python -m benchmarks.cache_codecs
+"""
+import timeit
+import uuid
+from datetime import date
+
+import orjson
+from core.codecs import CODECS, OrjsonCodec
+from core.compression import COMPRESSORS
+from models.film import Film, FilmShort
+from pydantic import BaseModel
+
+PAGE_SIZE = 50
+NUMBER = 200
+
+
+def legacy_dumps(instances: list[BaseModel]) -> bytes:
+    """Прежний формат: JSON-массив JSON-строк."""
+    return orjson.dumps([instance.json() for instance in instances])
+
+
+def legacy_loads(data: bytes, model: type[BaseModel]) -> list[BaseModel]:
+    return [model.parse_raw(item) for item in orjson.loads(data)]
+
+
+def make_page(model: type[BaseModel]) -> list[BaseModel]:
+    person = {"uuid": uuid.uuid4(), "full_name": "Some Person"}
+    return [
+        model(
+            uuid=uuid.uuid4(),
+            title=f"Film {number}",
+            imdb_rating=number / 10,
+            description="Description " * 20,
+            creation_date=date(2000, 1, 1),
+            genre=[{"uuid": uuid.uuid4(), "name": "Action"}],
+            actors=[person] * 10,
+            writers=[person] * 3,
+            directors=[person],
+        )
+        for number in range(PAGE_SIZE)
+    ]
+
+
+def bench(label: str, dumps, loads, page: list[BaseModel], model) -> float:
+    data = dumps(page)
+    assert loads(data, model) == page
+    write = timeit.timeit(lambda: dumps(page), number=NUMBER) / NUMBER
+    read = timeit.timeit(lambda: loads(data, model), number=NUMBER) / NUMBER
+    print(
+        f"{label:<10} {len(data):>8} б {write * 1e6:>10.1f} мкс"
+        f" {read * 1e6:>10.1f} мкс"
+    )
+    return read
+
+
+def bench_compression(page: list[BaseModel]) -> None:
+    data = OrjsonCodec().dumps(page)
+    print(f"{'сжатие':<10} {'размер':>10} {'сжатие':>14} {'распаковка':>14}")
+    for name, compressor_class in COMPRESSORS.items():
+        try:
+            compressor = compressor_class()
+        except RuntimeError as e:
+            print(f"{name:<10} пропущен: {e}")
+            continue
+        compressed = compressor.compress(data)
+        assert compressor.decompress(compressed) == data
+        write = timeit.timeit(lambda: compressor.compress(data), number=NUMBER)
+        read = timeit.timeit(
+            lambda: compressor.decompress(compressed), number=NUMBER
+        )
+        print(
+            f"{name:<10} {len(compressed):>8} б"
+            f" {write / NUMBER * 1e6:>10.1f} мкс"
+            f" {read / NUMBER * 1e6:>10.1f} мкс"
+            f" (экономия {1 - len(compressed) / len(data):.0%})"
+        )
+
+
+def main() -> None:
+    for model in (FilmShort, Film):
+        page = make_page(model)
+        print(f"\n{model.__name__} x {PAGE_SIZE}")
+        print(f"{'кодек':<10} {'размер':>10} {'запись':>14} {'чтение':>14}")
+        base = bench("legacy", legacy_dumps, legacy_loads, page, model)
+        for name, codec_class in CODECS.items():
+            try:
+                codec = codec_class()
+            except RuntimeError as e:
+                print(f"{name:<10} пропущен: {e}")
+                continue
+            read = bench(name, codec.dumps, codec.loads, page, model)
+            print(f"{'':<10} чтение быстрее legacy в {base / read:.1f} раз")
+        bench_compression(page)
+
+
+if __name__ == "__main__":
+    main()
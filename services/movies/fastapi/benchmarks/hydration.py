@@ -0,0 +1,139 @@
+"""Микробенчмарк сборки объектов из документов Elasticsearch.
+
+Сравнивает для страницы из 50 документов Film и Person сборку объектов
+с валидацией (как в ElasticService) и без нее, рекурсивным
+model_construct, а также стоимость всего ответа: сборки и подготовки
+тела ответа по response_model, которую FastAPI выполняет для любых
+возвращенных эндпоинтом объектов.
+
+Запуск из папки fastapi:
+    python -m benchmarks.hydration
+"""
+import timeit
+import uuid
+from datetime import date
+from typing import Any
+from uuid import UUID
+
+from core.projection import _is_model, _item_type
+from core.storage import ElasticService
+from models.film import Film
+from models.person import Person
+from pydantic import BaseModel, TypeAdapter
+
+PAGE_SIZE = 50
+NUMBER = 200
+
+
+def film_document(number: int) -> dict:
+    """Документ фильма, как его возвращает Elasticsearch."""
+    person = {"uuid": str(uuid.uuid4()), "full_name": "Some Person"}
+    return {
+        "uuid": str(uuid.uuid4()),
+        "title": f"Film {number}",
+        "imdb_rating": number / 10,
+        "description": "Description " * 20,
+        "creation_date": "2000-01-01",
+        "subscribers_only": False,
+        "genre": [{"uuid": str(uuid.uuid4()), "name": "Action"}],
+        "actors": [person] * 10,
+        "writers": [person] * 3,
+        "directors": [person],
+    }
+
+
+def person_document(number: int) -> dict:
+    """Документ персоны, как его возвращает Elasticsearch."""
+    return {
+        "uuid": str(uuid.uuid4()),
+        "full_name": f"Person {number}",
+        "films": [
+            {
+                "uuid": str(uuid.uuid4()),
+                "title": f"Film {film}",
+                "imdb_rating": film / 10,
+                "roles": "actor",
+            }
+            for film in range(10)
+        ],
+    }
+
+
+def construct_value(annotation: Any, value: Any) -> Any:
+    """Значение поля без валидации: вложенные модели собираются
+    рекурсивно, из строк переводятся только UUID и даты.
+    """
+    if value is None:
+        return None
+    item = _item_type(annotation)
+    if isinstance(value, list):
+        return [construct_value(item, element) for element in value]
+    if _is_model(item):
+        return construct(item, value)
+    if item is UUID:
+        return UUID(value)
+    if item is date:
+        return date.fromisoformat(value)
+    return value
+
+
+def construct(model: type[BaseModel], document: dict) -> BaseModel:
+    """Модель из документа через model_construct без валидации."""
+    return model.model_construct(
+        **{
+            name: construct_value(field.annotation, document[name])
+            for name, field in model.model_fields.items()
+            if name in document
+        }
+    )
+
+
+def validated(model: type[BaseModel], documents: list[dict]) -> list:
+    return ElasticService._validate(model, documents)
+
+
+def constructed(model: type[BaseModel], documents: list[dict]) -> list:
+    return [construct(model, document) for document in documents]
+
+
+STRATEGIES = {"validated": validated, "construct": constructed}
+
+
+def respond(adapter: TypeAdapter, instances: list) -> list:
+    """Подготовка тела ответа, как в fastapi.routing.serialize_response:
+    модели ответа проходят как есть, остальные объекты собираются в них
+    по атрибутам.
+    """
+    return adapter.dump_python(
+        adapter.validate_python(instances, from_attributes=True), mode="json"
+    )
+
+
+def bench(model: type[BaseModel], documents: list[dict]) -> None:
+    adapter = TypeAdapter(list[model])
+    expected = respond(adapter, validated(model, documents))
+    print(f"\n{model.__name__} x {PAGE_SIZE}")
+    print(f"{'стратегия':<10} {'сборка':>14} {'ответ':>14}")
+    for name, hydrate in STRATEGIES.items():
+        assert respond(adapter, hydrate(model, documents)) == expected
+        build = (
+            timeit.timeit(lambda: hydrate(model, documents), number=NUMBER)
+            / NUMBER
+        )
+        total = (
+            timeit.timeit(
+                lambda: respond(adapter, hydrate(model, documents)),
+                number=NUMBER,
+            )
+            / NUMBER
+        )
+        print(f"{name:<10} {build * 1e3:>10.2f} мс {total * 1e3:>10.2f} мс")
+
+
+def main() -> None:
+    bench(Film, [film_document(number) for number in range(PAGE_SIZE)])
+    bench(Person, [person_document(number) for number in range(PAGE_SIZE)])
+
+
+if __name__ == "__main__":
+    main()
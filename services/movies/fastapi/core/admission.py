@@ -0,0 +1,97 @@
+"""Допуск записей в кэш по частоте обращений (TinyLFU).
+
+Ключи разовых запросов (например, тела расширенного поиска почти
+не повторяются) вытесняли бы из Redis при maxmemory полезные записи.
+Поэтому запись ключа операции из CACHE_ADMISSION_OPERATIONS
+сохраняется, только если к ключу уже обращались больше
+CACHE_ADMISSION_MIN_HITS раз или значение не больше
+CACHE_ADMISSION_FREE_BYTES.
+
+Частота обращений оценивается count-min sketch в памяти воркера.
+После каждых CACHE_ADMISSION_SAMPLE_SIZE обращений счетчики делятся
+пополам, поэтому давняя популярность ключа постепенно забывается.
+"""
+from hashlib import blake2b
+
+from core.config import settings
+from core.metrics import metrics
+
+# Счетчики sketch - байты, насыщаются на этом значении
+MAX_COUNT = 255
+
+
+class CountMinSketch:
+    """Оценка частоты ключей сверху: depth строк по width счетчиков,
+    частота - минимум счетчиков ключа по строкам.
+    """
+
+    def __init__(self, width: int, depth: int = 4) -> None:
+        self.width = max(width, 1)
+        self.depth = depth
+        self._counters = bytearray(self.width * self.depth)
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            if self._counters[position] < MAX_COUNT:
+                self._counters[position] += 1
+
+    def estimate(self, item: str) -> int:
+        return min(
+            self._counters[position] for position in self._positions(item)
+        )
+
+    def halve(self) -> None:
+        """Старение: все счетчики делятся пополам."""
+        self._counters = bytearray(count >> 1 for count in self._counters)
+
+    def _positions(self, item: str):
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return (
+            row * self.width + (first + row * second) % self.width
+            for row in range(self.depth)
+        )
+
+
+class AdmissionFilter:
+    """Фильтр допуска записей в кэш с периодическим старением."""
+
+    def __init__(self) -> None:
+        self.sketch = CountMinSketch(settings.CACHE_ADMISSION_WIDTH)
+        self._additions = 0
+
+    @staticmethod
+    def applies(key: str) -> bool:
+        """Проходит ли ключ через фильтр (по операции в ключе)."""
+        parts = key.split(":", 2)
+        return (
+            len(parts) > 1 and parts[1] in settings.CACHE_ADMISSION_OPERATIONS
+        )
+
+    def record(self, key: str) -> None:
+        """Учитывает обращение к ключу."""
+        if not self.applies(key):
+            return
+        self.sketch.add(key)
+        self._additions += 1
+        if self._additions >= settings.CACHE_ADMISSION_SAMPLE_SIZE:
+            self.sketch.halve()
+            self._additions = 0
+            metrics.incr("cache.admission.aged")
+
+    def admit(self, key: str, value: bytes) -> bool:
+        """Можно ли сохранить значение ключа в кэш."""
+        if not self.applies(key):
+            return True
+        if (
+            len(value) <= settings.CACHE_ADMISSION_FREE_BYTES
+            or self.sketch.estimate(key) > settings.CACHE_ADMISSION_MIN_HITS
+        ):
+            metrics.incr("cache.admission.admitted")
+            return True
+        metrics.incr("cache.admission.rejected")
+        return False
+
+
+admission_filter = AdmissionFilter()
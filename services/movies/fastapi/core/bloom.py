@@ -0,0 +1,158 @@
+"""Фильтры Блума UUID документов индексов.
+
+Каждый воркер держит в памяти по фильтру на индекс и по нему сразу
+отвечает 404 на запросы документов, которых в индексе точно нет,
+не обращаясь ни к Redis, ни к Elasticsearch. Пока фильтр индекса
+не построен, все UUID считаются возможно существующими.
+"""
+import asyncio
+import math
+from hashlib import blake2b
+from uuid import UUID
+
+from core.config import settings
+from core.logger import logger
+from core.metrics import metrics
+from core.storage import AbstractStorage
+
+
+class BloomFilter:
+    """Фильтр Блума на битовом массиве с двойным хешированием.
+
+    Размер подбирается под ожидаемое число элементов и долю ложных
+    срабатываний, но не больше max_bytes: при упоре в лимит памяти
+    доля ложных срабатываний будет выше заданной.
+    """
+
+    def __init__(
+        self, capacity: int, error_rate: float, max_bytes: int
+    ) -> None:
+        capacity = max(capacity, 1)
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.size = max(min(bits, max_bytes * 8), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.count = 0
+        self._bits = bytearray(math.ceil(self.size / 8))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+    @property
+    def error_rate(self) -> float:
+        """Оценка доли ложных срабатываний при текущем заполнении."""
+        return (
+            1 - math.exp(-self.hashes * self.count / self.size)
+        ) ** self.hashes
+
+    def add(self, item: UUID | str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: UUID | str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+    def _positions(self, item: UUID | str):
+        digest = blake2b(str(item).encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+
+class UUIDFilters:
+    """Фильтры Блума UUID по индексам с периодическим обновлением.
+
+    Фильтр индекса перестраивается, если изменилась версия индекса
+    (число документов и операций записи) или с последней сборки
+    прошло CACHE_BLOOM_REBUILD_IN_SECONDS. Новый документ попадает
+    в фильтр при ближайшей проверке версии, до этого на запрос по его
+    UUID воркер отвечает 404. Воркер, получивший его UUID через
+    /api/internal/cache/invalidate, добавляет его в фильтр сразу (add),
+    остальные воркеры ждут проверки версии.
+    """
+
+    def __init__(self) -> None:
+        self._filters: dict[str, BloomFilter] = {}
+        self._versions: dict[str, str] = {}
+        self._built_at: dict[str, float] = {}
+        self._task: asyncio.Task | None = None
+
+    def might_contain(self, index: str, uuid: UUID | str) -> bool:
+        """False, только если документа с uuid в индексе точно нет."""
+        bloom = self._filters.get(str(index))
+        if bloom is None or uuid in bloom:
+            return True
+        metrics.incr(f"bloom.{index}.rejected")
+        return False
+
+    def add(self, index: str, uuids: list[UUID]) -> None:
+        """Добавляет UUID в фильтр индекса, если он уже построен."""
+        bloom = self._filters.get(str(index))
+        if bloom is None:
+            return
+        for uuid in uuids:
+            bloom.add(uuid)
+        metrics.set_gauge(f"bloom.{index}.items", bloom.count)
+
+    async def start(self, storage: AbstractStorage, indexes: list[str]):
+        """Строит фильтры индексов и запускает их фоновое обновление."""
+        await self.refresh(storage, indexes)
+        self._task = asyncio.create_task(self._refresh_loop(storage, indexes))
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def refresh(self, storage: AbstractStorage, indexes: list[str]):
+        """Перестраивает фильтры индексов, версия которых изменилась."""
+        loop = asyncio.get_running_loop()
+        for index in map(str, indexes):
+            try:
+                version = await storage.get_index_version(index)
+                expired = (
+                    loop.time() - self._built_at.get(index, 0)
+                    >= settings.CACHE_BLOOM_REBUILD_IN_SECONDS
+                )
+                if version is None:
+                    # индекса нет: фильтр не используется до его появления
+                    self._filters.pop(index, None)
+                    self._versions.pop(index, None)
+                elif version != self._versions.get(index) or expired:
+                    await self._build(storage, index, version)
+                    self._built_at[index] = loop.time()
+            except Exception as e:
+                logger.error(f"Ошибка обновления фильтра {index}: {e}")
+
+    async def _build(
+        self, storage: AbstractStorage, index: str, version: str
+    ) -> None:
+        uuids = [uuid async for uuid in storage.iter_ids(index)]
+        bloom = BloomFilter(
+            capacity=len(uuids),
+            error_rate=settings.CACHE_BLOOM_ERROR_RATE,
+            max_bytes=settings.CACHE_BLOOM_MAX_BYTES,
+        )
+        for uuid in uuids:
+            bloom.add(uuid)
+        self._filters[index] = bloom
+        self._versions[index] = version
+        metrics.incr(f"bloom.{index}.rebuilds")
+        metrics.set_gauge(f"bloom.{index}.items", bloom.count)
+        metrics.set_gauge(f"bloom.{index}.bytes", bloom.size_bytes)
+        metrics.set_gauge(f"bloom.{index}.error_rate", bloom.error_rate)
+
+    async def _refresh_loop(
+        self, storage: AbstractStorage, indexes: list[str]
+    ) -> None:
+        while True:
+            await asyncio.sleep(settings.CACHE_BLOOM_CHECK_IN_SECONDS)
+            await self.refresh(storage, indexes)
+
+
+uuid_filters = UUIDFilters()
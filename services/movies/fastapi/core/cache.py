@@ -1,72 +1,818 @@
+import hashlib
+import math
+import random
+import struct
+import time
+import uuid
 from abc import ABC, abstractmethod
+from collections import Counter
 from functools import lru_cache
+from typing import Iterable
+from uuid import UUID
 
 import orjson
-from core.config import settings
+from core.admission import admission_filter
+from core.codecs import AbstractCacheCodec, get_codec
+from core.compression import (
+    MARKERS,
+    AbstractCompressor,
+    get_compressor,
+    get_compressor_by_marker,
+)
+from core.config import CacheTTL, settings
+from core.invalidation import (
+    PUBSUB_CHANNEL,
+    InvalidationListener,
+    invalidation_listener,
+)
+from core.local_cache import LocalLRUCache
+from core.metrics import metrics
 from db.redis import get_redis_instance
 from pydantic import BaseModel
 from redis.asyncio import Redis
 
-from fastapi import Depends, Request
+from fastapi import Depends
+
+# Заголовок записи кэша: момент истечения свежести (unix time)
+# и время вычисления значения в секундах
+ENTRY_HEADER = struct.Struct("!dd")
+
+# Снятие аренды только ее владельцем (сравнение токена и удаление атомарно)
+RELEASE_LEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Запись значения с TTL и добавление ее ключа в наборы тегов (KEYS[2:]).
+# TTL набора тега только продлевается, чтобы он жил не меньше своих записей
+SET_TAGGED_SCRIPT = """
+local ttl = tonumber(ARGV[2])
+redis.call("set", KEYS[1], ARGV[1], "ex", ttl)
+for i = 2, #KEYS do
+    redis.call("sadd", KEYS[i], KEYS[1])
+    if redis.call("ttl", KEYS[i]) < ttl then
+        redis.call("expire", KEYS[i], ttl)
+    end
+end
+"""
+
+# Удаление всех записей из наборов тегов KEYS и самих наборов.
+# Возвращает удаленные ключи записей
+INVALIDATE_TAGS_SCRIPT = """
+local keys = {}
+for _, tag in ipairs(KEYS) do
+    for _, key in ipairs(redis.call("smembers", tag)) do
+        keys[#keys + 1] = key
+    end
+end
+for i = 1, #keys, 1000 do
+    redis.call("del", unpack(keys, i, math.min(i + 999, #keys)))
+end
+redis.call("del", unpack(KEYS))
+return keys
+"""
+
+
+class CacheEntry:
+    """Запись кэша: список объектов, момент истечения их свежести
+    и время вычисления значения (delta).
+
+    После истечения свежести запись еще некоторое время хранится
+    и может быть отдана как устаревшая, пока значение пересчитывается.
+    """
+
+    __slots__ = ("instances", "expire_at", "delta")
+
+    def __init__(
+        self, instances: list[BaseModel], expire_at: float, delta: float = 0.0
+    ) -> None:
+        self.instances = instances
+        self.expire_at = expire_at
+        self.delta = delta
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() < self.expire_at
+
+    def should_refresh_early(self, beta: float) -> bool:
+        """Вероятностное досрочное обновление (XFetch).
+
+        Чем ближе истечение свежести и чем дольше вычисляется значение,
+        тем вероятнее, что читатель обновит запись заранее, поэтому
+        записи, созданные одновременно, обновляются в разное время.
+        """
+        if beta <= 0 or self.delta <= 0:
+            return False
+        gap = -self.delta * beta * math.log(1.0 - random.random())
+        return time.time() + gap >= self.expire_at
 
 
 class AbstractCacheService(ABC):
     """Абстрактный класс-интерфейс для сервисов кэширования"""
 
-    @abstractmethod
     async def get_instances_from_cache(
-        self, request: Request, model: BaseModel
+        self, key: str, model: BaseModel
     ) -> list[BaseModel | None]:
-        """Абстрактый метод получения списка объектов, хранящихся в кэше"""
+        """Метод получения списка свежих объектов, хранящихся в кэше"""
+        entry = await self.get_entry(key=key, model=model)
+        if entry and entry.is_fresh:
+            return entry.instances
+        return []
+
+    @abstractmethod
+    async def get_entry(self, key: str, model: BaseModel) -> CacheEntry | None:
+        """Абстрактный метод получения записи кэша, в том числе устаревшей"""
+
+    @abstractmethod
+    async def get_entries(
+        self, keys: list[str], model: BaseModel
+    ) -> list[CacheEntry | None]:
+        """Абстрактный метод пакетного получения записей кэша
+        (в порядке ключей, None - для отсутствующих)
+        """
 
     @abstractmethod
     async def put_instances_to_cache(
-        self, request: Request, instances: list[BaseModel]
+        self,
+        key: str,
+        instances: list[BaseModel],
+        ttl: CacheTTL,
+        delta: float = 0.0,
     ) -> None:
         """Абстрактный метод сохранения списка объектов в кэш"""
 
+    @abstractmethod
+    async def put_many_to_cache(
+        self,
+        items: dict[str, list[BaseModel]],
+        ttl: CacheTTL,
+        deltas: dict[str, float] | None = None,
+    ) -> None:
+        """Абстрактный метод пакетного сохранения записей в кэш
+        (deltas - время вычисления записей по ключам)
+        """
+
+    @abstractmethod
+    async def invalidate(
+        self, index: str, uuids: list[UUID | str] | None = None
+    ) -> int:
+        """Абстрактный метод удаления записей, зависящих от документов
+        uuids индекса index (без uuids - всех записей индекса).
+        Возвращает число удаленных записей.
+        """
+
+    @abstractmethod
+    async def acquire_lease(self, key: str) -> str | None:
+        """Абстрактный метод получения аренды на пересчет записи кэша.
+        Возвращает токен аренды или None, если аренда уже занята.
+        """
+
+    @abstractmethod
+    async def release_lease(self, key: str, token: str) -> None:
+        """Абстрактный метод снятия аренды на пересчет записи кэша"""
+
 
-class ExtractKeyFromRequest:
-    @staticmethod
-    def _calc_key(request: Request) -> str:
-        """Общий метод получения параметра key для сервисов кэширования"""
-        body_key = ""
-        if hasattr(request, "_body"):
-            body_key = str(request._body)
-        return str(request.url) + body_key
+def build_cache_key(index: str, operation: str, **params) -> str:
+    """Канонический ключ кэша для операции сервиса.
 
+    Ключ состоит из читаемого префикса (индекс и операция) и хэша
+    фиксированной длины от нормализованных параметров запроса: словари
+    сортируются по ключам, поэтому порядок параметров, пробелы в теле
+    запроса и хост не влияют на ключ, а значения по умолчанию уже
+    подставлены эндпоинтом.
+    """
+    normalized = orjson.dumps(
+        params, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+    )
+    digest = hashlib.blake2b(normalized, digest_size=16).hexdigest()
+    return f"{index}:{operation}:{digest}"
 
-class RedisService(AbstractCacheService, ExtractKeyFromRequest):
-    def __init__(self, redis_instance: Redis) -> None:
+
+def jittered(seconds: int) -> int:
+    """TTL, уменьшенный на случайную долю до CACHE_TTL_JITTER,
+    чтобы записи, сохраненные одновременно, не истекали вместе.
+    """
+    factor = 1 - random.uniform(0, settings.CACHE_TTL_JITTER)
+    return max(int(seconds * factor), 1)
+
+
+def cache_tags(key: str, instances: list[BaseModel]) -> list[str]:
+    """Теги записи кэша для инвалидации.
+
+    Каждая запись помечается тегом своего индекса (index:...), записи
+    списков - еще и тегом списков индекса (list:...), а также тегами
+    UUID документов (doc:...), которые в нее входят: документа записи
+    EntityCache (даже негативной) и документов страницы CachedPage.
+    """
+    prefix, index, *rest = key.split(":", 2)
+    if prefix == EntityCache.prefix:
+        # после uuid в ключе может идти имя проекции
+        tags = {f"index:{index}", f"doc:{rest[0].split(':')[0]}"}
+    else:
+        index = prefix
+        tags = {f"index:{index}", f"list:{index}"}
+    for instance in instances:
+        if (uuids := getattr(instance, "uuids", None)) is not None:
+            tags.update(f"doc:{uuid}" for uuid in uuids)
+        elif (uuid_ := getattr(instance, "uuid", None)) is not None:
+            tags.add(f"doc:{uuid_}")
+    return sorted(tags)
+
+
+def invalidation_tags(
+    index: str, uuids: list[UUID | str] | None = None
+) -> list[str]:
+    """Теги записей, устаревающих при изменении документов индекса.
+
+    Изменение документа может поменять состав любого списка индекса,
+    поэтому вместе с записями документов удаляются все списки индекса.
+    """
+    if uuids is None:
+        return [f"index:{index}"]
+    return [f"list:{index}", *(f"doc:{uuid}" for uuid in uuids)]
+
+
+class EntityCache:
+    """Кэш документов хранилища по паре (индекс, uuid).
+
+    Документ хранится одной записью, общей для всех эндпоинтов, которые
+    его показывают, поэтому одно чтение из Elasticsearch прогревает их все.
+    Списочные эндпоинты заполняют этот кэш пакетно. Неполные документы
+    (проекции, см. core.projection) хранятся отдельно, с именем проекции
+    в конце ключа.
+    """
+
+    prefix = "entity"
+
+    def __init__(self, cache: AbstractCacheService) -> None:
+        self.cache = cache
+
+    @classmethod
+    def key(
+        cls, index: str, uuid: UUID | str, projection: str | None = None
+    ) -> str:
+        """Ключ записи документа (или его проекции)."""
+        key = f"{cls.prefix}:{index}:{uuid}"
+        return f"{key}:{projection}" if projection else key
+
+    async def get_many(
+        self,
+        index: str,
+        uuids: list[UUID | str],
+        model: BaseModel,
+        projection: str | None = None,
+    ) -> dict[str, CacheEntry]:
+        """Метод получения документов одним запросом (MGET).
+        Возвращает записи найденных документов по строковому uuid.
+        """
+        entries = await self.cache.get_entries(
+            [self.key(index, uuid, projection) for uuid in uuids], model
+        )
+        return {
+            str(uuid): entry
+            for uuid, entry in zip(uuids, entries)
+            if entry is not None
+        }
+
+    async def put_many(
+        self,
+        index: str,
+        instances: list[BaseModel],
+        ttl: CacheTTL,
+        projection: str | None = None,
+    ) -> None:
+        """Метод сохранения документов одним пакетом команд (pipeline)."""
+        await self.cache.put_many_to_cache(
+            self.items(index, instances, projection), ttl
+        )
+
+    @classmethod
+    def items(
+        cls,
+        index: str,
+        instances: list[BaseModel],
+        projection: str | None = None,
+    ) -> dict[str, list[BaseModel]]:
+        """Записи документов по ключам для пакетного сохранения."""
+        return {
+            cls.key(index, instance.uuid, projection): [instance]
+            for instance in instances
+        }
+
+
+class RedisService(AbstractCacheService):
+    def __init__(
+        self,
+        redis_instance: Redis,
+        codec: AbstractCacheCodec,
+        compressor: AbstractCompressor | None = None,
+    ) -> None:
         self.redis = redis_instance
+        self.codec = codec
+        self.compressor = compressor
+        # Без серверной инвалидации воркеры сами рассылают измененные ключи
+        self.publish_changes = settings.CACHE_L1_INVALIDATION == "pubsub"
+        # Версия формата и имя кодека входят в ключ, поэтому записи разных
+        # форматов не пересекаются и старые просто истекают по TTL
+        self.key_prefix = (
+            f"{settings.CACHE_KEY_PREFIX}:v{settings.CACHE_KEY_VERSION}:"
+            f"{codec.name}:"
+        )
+        self.lease_prefix = f"{settings.CACHE_KEY_PREFIX}:lease:"
+        self.tag_prefix = f"{settings.CACHE_KEY_PREFIX}:tag:"
+        self._release_lease = self.redis.register_script(RELEASE_LEASE_SCRIPT)
+        self._set_tagged = self.redis.register_script(SET_TAGGED_SCRIPT)
+        self._invalidate_tags = self.redis.register_script(
+            INVALIDATE_TAGS_SCRIPT
+        )
 
-    async def get_instances_from_cache(
-        self, request: Request, model: BaseModel
-    ) -> list[BaseModel | None]:
-        """Метод получения списка объектов, хранящихся в кэше Redis"""
-        key = self._calc_key(request)
-        instances = []
-        json_data = await self.redis.get(key)
-        if json_data:
-            for data in orjson.loads(json_data):
-                instances.append(model.parse_raw(data))
-        return instances
+    async def get_entry(self, key: str, model: BaseModel) -> CacheEntry | None:
+        """Метод получения записи кэша из Redis"""
+        data = await self.get_raw(key)
+        if not data:
+            metrics.incr("cache.l2.miss")
+            return None
+        metrics.incr("cache.l2.hit")
+        return self.loads(data, model)
+
+    async def get_entries(
+        self, keys: list[str], model: BaseModel
+    ) -> list[CacheEntry | None]:
+        """Метод пакетного получения записей кэша из Redis (MGET)"""
+        entries = []
+        for data in await self.get_many_raw(keys):
+            metrics.incr("cache.l2.hit" if data else "cache.l2.miss")
+            entries.append(self.loads(data, model) if data else None)
+        return entries
 
     async def put_instances_to_cache(
-        self, request: Request, instances: list[BaseModel]
+        self,
+        key: str,
+        instances: list[BaseModel],
+        ttl: CacheTTL,
+        delta: float = 0.0,
     ) -> None:
         """Метод сохранения списка объектов в кэш Redis"""
-        key = self._calc_key(request)
-        json = orjson.dumps(
-            [instance.json() for instance in instances]
-        ).decode()
-        await self.redis.set(
-            name=key, value=json, ex=settings.CACHE_EXPIRE_IN_SECONDS
+        data = self.dumps(instances, ttl, delta)
+        if admission_filter.admit(key, data):
+            await self.set_raw(key, data, ttl, cache_tags(key, instances))
+
+    async def put_many_to_cache(
+        self,
+        items: dict[str, list[BaseModel]],
+        ttl: CacheTTL,
+        deltas: dict[str, float] | None = None,
+    ) -> None:
+        """Метод пакетного сохранения записей в кэш Redis"""
+        deltas = deltas or {}
+        values = {
+            key: self.dumps(instances, ttl, deltas.get(key, 0.0))
+            for key, instances in items.items()
+        }
+        await self.set_many_raw(
+            {
+                key: data
+                for key, data in values.items()
+                if admission_filter.admit(key, data)
+            },
+            ttl,
+            {
+                key: cache_tags(key, instances)
+                for key, instances in items.items()
+            },
+        )
+
+    async def invalidate(
+        self, index: str, uuids: list[UUID | str] | None = None
+    ) -> int:
+        """Метод удаления записей, зависящих от документов индекса"""
+        return len(await self.invalidate_tags(invalidation_tags(index, uuids)))
+
+    async def invalidate_tags(self, tags: list[str]) -> list[str]:
+        """Метод атомарного удаления всех записей с указанными тегами.
+        Возвращает ключи удаленных записей (без префикса).
+        """
+        if not tags:
+            return []
+        deleted = await self._invalidate_tags(
+            keys=[self.tag_prefix + tag for tag in tags]
+        )
+        metrics.incr("cache.invalidated", len(deleted))
+        if deleted and self.publish_changes:
+            await self.redis.publish(
+                PUBSUB_CHANNEL, orjson.dumps([key.decode() for key in deleted])
+            )
+        size = len(self.key_prefix)
+        return [key.decode()[size:] for key in deleted]
+
+    async def acquire_lease(self, key: str) -> str | None:
+        """Метод получения аренды на пересчет записи (SET NX PX).
+        Аренду получает ровно один воркер среди всех контейнеров.
+        """
+        token = uuid.uuid4().hex
+        acquired = await self.redis.set(
+            name=self.lease_prefix + key,
+            value=token,
+            nx=True,
+            px=settings.CACHE_LEASE_TTL_MS,
+        )
+        if acquired:
+            metrics.incr("cache.lease.acquired")
+            return token
+        metrics.incr("cache.lease.busy")
+        return None
+
+    async def release_lease(self, key: str, token: str) -> None:
+        """Метод снятия аренды, если она еще принадлежит этому воркеру"""
+        await self._release_lease(keys=[self.lease_prefix + key], args=[token])
+
+    async def get_raw(self, key: str) -> bytes | None:
+        """Метод получения сериализованного значения из Redis"""
+        admission_filter.record(key)
+        data = await self.redis.get(self.key_prefix + key)
+        return self.decompress(data) if data else data
+
+    async def get_many_raw(self, keys: list[str]) -> list[bytes | None]:
+        """Метод получения сериализованных значений одним запросом MGET"""
+        if not keys:
+            return []
+        for key in keys:
+            admission_filter.record(key)
+        values = await self.redis.mget([self.key_prefix + key for key in keys])
+        return [self.decompress(data) if data else data for data in values]
+
+    async def set_many_raw(
+        self,
+        values: dict[str, bytes],
+        ttl: CacheTTL,
+        tags: dict[str, list[str]] | None = None,
+    ) -> None:
+        """Метод сохранения сериализованных значений одним pipeline"""
+        if not values:
+            return
+        tags = tags or {}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                value = self.compress(value)
+                if key_tags := tags.get(key):
+                    await self._set_tagged(
+                        keys=self._tagged_keys(key, key_tags),
+                        args=[value, jittered(ttl.hard)],
+                        client=pipe,
+                    )
+                else:
+                    pipe.set(
+                        name=self.key_prefix + key,
+                        value=value,
+                        ex=jittered(ttl.hard),
+                    )
+            if self.publish_changes:
+                pipe.publish(
+                    PUBSUB_CHANNEL,
+                    orjson.dumps([self.key_prefix + key for key in values]),
+                )
+            await pipe.execute()
+
+    async def set_raw(
+        self,
+        key: str,
+        value: bytes,
+        ttl: CacheTTL,
+        tags: list[str] | None = None,
+    ) -> None:
+        """Метод сохранения сериализованного значения в Redis.
+        Запись хранится до жесткого TTL, чтобы после истечения мягкого
+        ее можно было отдать устаревшей, пока значение пересчитывается.
+        С тегами ключ записи атомарно добавляется в наборы тегов.
+        """
+        value = self.compress(value)
+        if tags:
+            await self._set_tagged(
+                keys=self._tagged_keys(key, tags),
+                args=[value, jittered(ttl.hard)],
+            )
+        else:
+            await self.redis.set(
+                name=self.key_prefix + key, value=value, ex=jittered(ttl.hard)
+            )
+        if self.publish_changes:
+            await self.redis.publish(
+                PUBSUB_CHANNEL, orjson.dumps([self.key_prefix + key])
+            )
+
+    def compress(self, value: bytes) -> bytes:
+        """Сжатие значения не меньше CACHE_COMPRESSION_MIN_BYTES.
+        Значение остается несжатым, если сжатие его не уменьшает.
+        """
+        if (
+            self.compressor is None
+            or len(value) < settings.CACHE_COMPRESSION_MIN_BYTES
+        ):
+            return value
+        started = time.perf_counter()
+        compressed = self.compressor.compress(value)
+        metrics.incr(
+            "cache.compression.compress_seconds",
+            time.perf_counter() - started,
+        )
+        if len(compressed) + 1 >= len(value):
+            return value
+        metrics.incr("cache.compression.compressed")
+        metrics.incr(
+            "cache.compression.bytes_saved", len(value) - len(compressed) - 1
+        )
+        return bytes((self.compressor.marker,)) + compressed
+
+    def decompress(self, data: bytes) -> bytes:
+        """Распаковка значения по байту-маркеру алгоритма.
+        Значения без маркера (несжатые) возвращаются как есть.
+        """
+        marker = data[0]
+        if marker not in MARKERS:
+            return data
+        started = time.perf_counter()
+        value = get_compressor_by_marker(marker).decompress(
+            memoryview(data)[1:]
+        )
+        metrics.incr(
+            "cache.compression.decompress_seconds",
+            time.perf_counter() - started,
+        )
+        metrics.incr("cache.compression.decompressed")
+        metrics.set_gauge(
+            "cache.compression.decompress_us_per_hit",
+            metrics.value("cache.compression.decompress_seconds")
+            / metrics.value("cache.compression.decompressed")
+            * 1_000_000,
+        )
+        return value
+
+    def _tagged_keys(self, key: str, tags: list[str]) -> list[str]:
+        return [
+            self.key_prefix + key,
+            *(self.tag_prefix + tag for tag in tags),
+        ]
+
+    def dumps(
+        self, instances: list[BaseModel], ttl: CacheTTL, delta: float = 0.0
+    ) -> bytes:
+        """Сериализация списка объектов для хранения в кэше"""
+        expire_at = time.time() + jittered(ttl.soft)
+        return ENTRY_HEADER.pack(expire_at, delta) + self.codec.dumps(
+            instances
+        )
+
+    def loads(self, data: bytes, model: BaseModel) -> CacheEntry:
+        """Десериализация записи кэша"""
+        expire_at, delta = ENTRY_HEADER.unpack_from(data)
+        return CacheEntry(
+            instances=self.codec.loads(data[ENTRY_HEADER.size :], model),
+            expire_at=expire_at,
+            delta=delta,
         )
 
 
+class TwoTierCacheService(AbstractCacheService):
+    """Двухуровневый кэш: локальный LRU воркера (L1) перед Redis (L2).
+
+    В L1 хранятся уже собранные списки моделей, поэтому попадание в L1
+    обходится без обращения к сети и десериализации.
+
+    С включенным слушателем инвалидации запись удаляется из L1, как только
+    ее ключ изменился в Redis, а пока слушатель не подключен, L1
+    не используется. Значение, прочитанное или записанное в Redis
+    одновременно с изменением ключа, в L1 не попадает.
+    """
+
+    def __init__(
+        self,
+        local: LocalLRUCache,
+        remote: RedisService,
+        listener: InvalidationListener | None = None,
+    ) -> None:
+        self.local = local
+        self.remote = remote
+        self.listener = listener
+        # ключи, по которым идет обращение к Redis, и те из них,
+        # что были изменены за время обращения
+        self._pending: Counter[str] = Counter()
+        self._changed: set[str] = set()
+        if listener is not None:
+            listener.subscribe(self.on_invalidate)
+
+    def on_invalidate(self, keys: list[bytes] | None) -> None:
+        """Удаляет из L1 записи измененных ключей Redis (None - все)."""
+        if keys is None:
+            self.local.clear()
+            self._changed.update(self._pending)
+        else:
+            prefix = self.remote.key_prefix.encode()
+            for raw_key in keys:
+                if not raw_key.startswith(prefix):
+                    continue
+                key = raw_key[len(prefix) :].decode()
+                self.local.delete(key)
+                if key in self._pending:
+                    self._changed.add(key)
+        metrics.set_gauge("cache.l1.entries", len(self.local))
+        metrics.set_gauge("cache.l1.bytes", self.local.size_bytes)
+
+    @property
+    def local_enabled(self) -> bool:
+        return self.listener is None or self.listener.connected
+
+    async def get_entry(self, key: str, model: BaseModel) -> CacheEntry | None:
+        """Метод получения записи из L1, а при промахе - из Redis.
+        Устаревшая запись L1 перепроверяется в Redis: ее мог уже обновить
+        другой воркер.
+        """
+        local_entry = self._get_local(key)
+        if local_entry is not None and local_entry.is_fresh:
+            metrics.incr("cache.l1.hit")
+            return local_entry
+        metrics.incr("cache.l1.miss")
+        self._begin([key])
+        try:
+            data = await self.remote.get_raw(key)
+        finally:
+            changed = self._finish([key])
+        if not data:
+            metrics.incr("cache.l2.miss")
+            return local_entry
+        metrics.incr("cache.l2.hit")
+        entry = self.remote.loads(data, model)
+        if not changed:
+            self._put_local(key, entry, len(data))
+        return entry
+
+    async def get_entries(
+        self, keys: list[str], model: BaseModel
+    ) -> list[CacheEntry | None]:
+        """Метод пакетного получения записей: свежие берутся из L1,
+        остальные - одним MGET из Redis.
+        """
+        entries: list[CacheEntry | None] = []
+        remote_keys = []
+        for key in keys:
+            entry = self._get_local(key)
+            if entry is not None and entry.is_fresh:
+                metrics.incr("cache.l1.hit")
+            else:
+                metrics.incr("cache.l1.miss")
+                remote_keys.append(key)
+            entries.append(entry)
+        if not remote_keys:
+            return entries
+        self._begin(remote_keys)
+        try:
+            remote = dict(
+                zip(remote_keys, await self.remote.get_many_raw(remote_keys))
+            )
+        finally:
+            changed = self._finish(remote_keys)
+        for position, key in enumerate(keys):
+            if key not in remote:
+                continue
+            if (data := remote[key]) is None:
+                metrics.incr("cache.l2.miss")
+                continue
+            metrics.incr("cache.l2.hit")
+            entries[position] = self.remote.loads(data, model)
+            if key not in changed:
+                self._put_local(key, entries[position], len(data))
+        return entries
+
+    async def put_instances_to_cache(
+        self,
+        key: str,
+        instances: list[BaseModel],
+        ttl: CacheTTL,
+        delta: float = 0.0,
+    ) -> None:
+        """Метод сохранения списка объектов в Redis и в L1"""
+        data = self.remote.dumps(instances, ttl, delta)
+        if not admission_filter.admit(key, data):
+            return
+        self._begin([key])
+        try:
+            await self.remote.set_raw(
+                key, data, ttl, cache_tags(key, instances)
+            )
+        finally:
+            changed = self._finish([key])
+        if not changed:
+            self._put_local_data(key, instances, data)
+
+    async def put_many_to_cache(
+        self,
+        items: dict[str, list[BaseModel]],
+        ttl: CacheTTL,
+        deltas: dict[str, float] | None = None,
+    ) -> None:
+        """Метод пакетного сохранения записей в Redis и в L1"""
+        deltas = deltas or {}
+        values = {}
+        for key, instances in items.items():
+            data = self.remote.dumps(instances, ttl, deltas.get(key, 0.0))
+            if admission_filter.admit(key, data):
+                values[key] = data
+        self._begin(values)
+        try:
+            await self.remote.set_many_raw(
+                values,
+                ttl,
+                {
+                    key: cache_tags(key, instances)
+                    for key, instances in items.items()
+                },
+            )
+        finally:
+            changed = self._finish(values)
+        for key, data in values.items():
+            if key not in changed:
+                self._put_local_data(key, items[key], data)
+
+    async def invalidate(
+        self, index: str, uuids: list[UUID | str] | None = None
+    ) -> int:
+        """Метод удаления записей из Redis и из L1 этого воркера.
+        Без слушателя инвалидации в L1 других воркеров записи доживают
+        до CACHE_L1_TTL_IN_SECONDS.
+        """
+        deleted = await self.remote.invalidate_tags(
+            invalidation_tags(index, uuids)
+        )
+        for key in deleted:
+            self.local.delete(key)
+        metrics.set_gauge("cache.l1.entries", len(self.local))
+        metrics.set_gauge("cache.l1.bytes", self.local.size_bytes)
+        return len(deleted)
+
+    async def acquire_lease(self, key: str) -> str | None:
+        return await self.remote.acquire_lease(key)
+
+    async def release_lease(self, key: str, token: str) -> None:
+        await self.remote.release_lease(key, token)
+
+    def _begin(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self._pending[key] += 1
+
+    def _finish(self, keys: Iterable[str]) -> set[str]:
+        """Завершает обращение к Redis по ключам и возвращает те из них,
+        что были изменены за время обращения.
+        """
+        changed = set()
+        for key in keys:
+            if key in self._changed:
+                changed.add(key)
+            self._pending[key] -= 1
+            if self._pending[key] <= 0:
+                del self._pending[key]
+                self._changed.discard(key)
+        return changed
+
+    def _get_local(self, key: str) -> CacheEntry | None:
+        return self.local.get(key) if self.local_enabled else None
+
+    def _put_local_data(
+        self, key: str, instances: list[BaseModel], data: bytes
+    ) -> None:
+        expire_at, delta = ENTRY_HEADER.unpack_from(data)
+        self._put_local(
+            key, CacheEntry(instances, expire_at, delta), len(data)
+        )
+
+    def _put_local(self, key: str, entry: CacheEntry, size: int) -> None:
+        if not self.local_enabled:
+            return
+        self.local.put(key, entry, size)
+        metrics.set_gauge("cache.l1.entries", len(self.local))
+        metrics.set_gauge("cache.l1.bytes", self.local.size_bytes)
+        metrics.set_gauge("cache.l1.evictions", self.local.evictions)
+
+
 @lru_cache()
 def get_cache_service(
     redis_instance: Redis = Depends(get_redis_instance),
 ) -> AbstractCacheService:
-    return RedisService(redis_instance)
+    redis_service = RedisService(
+        redis_instance,
+        codec=get_codec(settings.CACHE_CODEC),
+        compressor=get_compressor(settings.CACHE_COMPRESSION),
+    )
+    if settings.CACHE_L1_MAX_ENTRIES <= 0:
+        return redis_service
+    return TwoTierCacheService(
+        local=LocalLRUCache(
+            max_entries=settings.CACHE_L1_MAX_ENTRIES,
+            max_bytes=settings.CACHE_L1_MAX_BYTES,
+            ttl=settings.CACHE_L1_TTL_IN_SECONDS,
+        ),
+        remote=redis_service,
+        listener=(
+            invalidation_listener if invalidation_listener.enabled else None
+        ),
+    )
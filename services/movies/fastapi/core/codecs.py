@@ -0,0 +1,108 @@
+"""Кодеки сериализации значений кэша.
+
+Каждый кодек переводит список моделей в байты и обратно за один проход:
+JSON разбирается сразу в модели через TypeAdapter, без промежуточного
+разбора строк каждой модели по отдельности.
+"""
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+@lru_cache()
+def list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    """Адаптер для валидации списка моделей (создается один раз на модель)."""
+    return TypeAdapter(list[model])
+
+
+class AbstractCacheCodec(ABC):
+    """Абстрактный класс-интерфейс кодека значений кэша"""
+
+    # Имя кодека входит в префикс ключа кэша
+    name: str
+
+    @abstractmethod
+    def dumps(self, instances: list[BaseModel]) -> bytes:
+        """Абстрактный метод сериализации списка объектов"""
+
+    @abstractmethod
+    def loads(self, data: bytes, model: type[BaseModel]) -> list[BaseModel]:
+        """Абстрактный метод десериализации списка объектов"""
+
+
+class OrjsonCodec(AbstractCacheCodec):
+    """JSON-массив объектов."""
+
+    name = "json"
+
+    def dumps(self, instances: list[BaseModel]) -> bytes:
+        return orjson.dumps([instance.model_dump() for instance in instances])
+
+    def loads(self, data: bytes, model: type[BaseModel]) -> list[BaseModel]:
+        return list_adapter(model).validate_json(data)
+
+
+class MsgpackCodec(AbstractCacheCodec):
+    """Массив объектов в формате MessagePack."""
+
+    name = "msgpack"
+
+    def __init__(self) -> None:
+        if msgpack is None:
+            raise RuntimeError("Для кодека msgpack не установлен пакет msgpack")
+
+    def dumps(self, instances: list[BaseModel]) -> bytes:
+        return msgpack.packb(
+            [instance.model_dump(mode="json") for instance in instances]
+        )
+
+    def loads(self, data: bytes, model: type[BaseModel]) -> list[BaseModel]:
+        return list_adapter(model).validate_python(msgpack.unpackb(data))
+
+
+class ColumnarCodec(AbstractCacheCodec):
+    """Колоночный JSON для страниц списков: имена полей хранятся один раз,
+    а каждая модель - массивом значений в порядке полей.
+
+    {"f": ["uuid", "title", ...], "r": [[...], [...]]}
+    """
+
+    name = "columnar"
+
+    def dumps(self, instances: list[BaseModel]) -> bytes:
+        rows = [instance.model_dump() for instance in instances]
+        fields = list(rows[0]) if rows else []
+        return orjson.dumps(
+            {"f": fields, "r": [list(row.values()) for row in rows]}
+        )
+
+    def loads(self, data: bytes, model: type[BaseModel]) -> list[BaseModel]:
+        payload = orjson.loads(data)
+        fields = payload["f"]
+        return list_adapter(model).validate_python(
+            [dict(zip(fields, row)) for row in payload["r"]]
+        )
+
+
+CODECS: dict[str, type[AbstractCacheCodec]] = {
+    OrjsonCodec.name: OrjsonCodec,
+    MsgpackCodec.name: MsgpackCodec,
+    ColumnarCodec.name: ColumnarCodec,
+}
+
+
+def get_codec(name: str) -> AbstractCacheCodec:
+    """Возвращает кодек по имени из настроек."""
+    try:
+        return CODECS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Неизвестный кодек кэша {name}, доступны: {', '.join(CODECS)}"
+        )
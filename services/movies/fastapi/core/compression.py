@@ -0,0 +1,115 @@
+"""Сжатие значений кэша.
+
+Сжатое значение начинается с байта-маркера алгоритма, за которым идут
+сжатые данные. Несжатые значения хранятся как есть: они начинаются
+с заголовка записи (момент истечения свежести, float64 big-endian),
+первый байт которого для текущих дат не меньше 0x40, поэтому
+с маркерами не пересекается.
+"""
+import zlib
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+class AbstractCompressor(ABC):
+    """Абстрактный класс-интерфейс алгоритма сжатия"""
+
+    # Имя алгоритма в настройках и байт-маркер в начале значения
+    name: str
+    marker: int
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Абстрактный метод сжатия"""
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        """Абстрактный метод распаковки"""
+
+
+class ZlibCompressor(AbstractCompressor):
+    """zlib из стандартной библиотеки с быстрым уровнем сжатия."""
+
+    name = "zlib"
+    marker = 0x01
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, 1)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCompressor(AbstractCompressor):
+    """Zstandard (нужен пакет zstandard)."""
+
+    name = "zstd"
+    marker = 0x02
+
+    def __init__(self) -> None:
+        if zstandard is None:
+            raise RuntimeError("Для сжатия zstd не установлен пакет zstandard")
+        self._compressor = zstandard.ZstdCompressor(level=3)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class Lz4Compressor(AbstractCompressor):
+    """LZ4 frame (нужен пакет lz4)."""
+
+    name = "lz4"
+    marker = 0x03
+
+    def __init__(self) -> None:
+        if lz4_frame is None:
+            raise RuntimeError("Для сжатия lz4 не установлен пакет lz4")
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4_frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4_frame.decompress(data)
+
+
+COMPRESSORS: dict[str, type[AbstractCompressor]] = {
+    ZlibCompressor.name: ZlibCompressor,
+    ZstdCompressor.name: ZstdCompressor,
+    Lz4Compressor.name: Lz4Compressor,
+}
+MARKERS: dict[int, type[AbstractCompressor]] = {
+    compressor.marker: compressor for compressor in COMPRESSORS.values()
+}
+
+
+def get_compressor(name: str) -> AbstractCompressor | None:
+    """Возвращает алгоритм сжатия по имени из настроек (none - без сжатия)."""
+    if name == "none":
+        return None
+    try:
+        return COMPRESSORS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Неизвестный алгоритм сжатия {name}, доступны: "
+            f"none, {', '.join(COMPRESSORS)}"
+        )
+
+
+@lru_cache()
+def get_compressor_by_marker(marker: int) -> AbstractCompressor:
+    """Возвращает алгоритм, которым сжато значение с маркером marker."""
+    return MARKERS[marker]()
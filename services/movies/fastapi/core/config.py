@@ -1,6 +1,7 @@
 import os
+from typing import Literal
 
-from pydantic import Field, SecretStr
+from pydantic import BaseModel, Field, SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # Корень проекта
@@ -8,6 +9,13 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 ENV_PATH = os.path.join(os.path.dirname(BASE_DIR), ".env")
 
 
+class CacheTTL(BaseModel):
+    """Мягкий (свежесть) и жесткий (хранение) TTL записи кэша в секундах."""
+
+    soft: int
+    hard: int
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=ENV_PATH, env_file_encoding="utf-8", extra="ignore"
@@ -18,10 +26,124 @@ class Settings(BaseSettings):
     REDIS_HOST: str = Field(default="127.0.0.1")
     REDIS_PORT: int = Field(default=6379)
     CACHE_EXPIRE_IN_SECONDS: int = 60 * 5  # 5 минут
+    # Кодек значений кэша: json, msgpack (нужен пакет msgpack) или columnar
+    CACHE_CODEC: str = "json"
+    # Сжатие значений кэша не меньше CACHE_COMPRESSION_MIN_BYTES:
+    # zlib, zstd (нужен пакет zstandard), lz4 (нужен пакет lz4) или none
+    CACHE_COMPRESSION: str = "zlib"
+    CACHE_COMPRESSION_MIN_BYTES: int = 1024
+    # Префикс и версия формата ключей кэша
+    CACHE_KEY_PREFIX: str = "movies"
+    CACHE_KEY_VERSION: int = 7
+    # Наибольшая доля, на которую случайно сокращается TTL записи
+    CACHE_TTL_JITTER: float = 0.1
+    # Досрочное обновление записей (XFetch): 0 - отключено, 1 - обычная
+    # агрессивность, больше 1 - обновлять раньше
+    CACHE_EARLY_REFRESH_BETA: float = 0.0
+    # Сколько хранится устаревшая запись после истечения CACHE_EXPIRE
+    CACHE_STALE_IN_SECONDS: int = 60
+    # Таблица мягких и жестких TTL: по именам эндпоинтов, затем
+    # по индексам (для записей документов и эндпоинтов без своего TTL),
+    # например CACHE_TTL_BY_ENDPOINT='{"genre_list": {"soft": 3600,
+    # "hard": 86400}}'. Значение из окружения заменяет таблицу целиком
+    CACHE_TTL_BY_ENDPOINT: dict[str, CacheTTL] = {
+        # фильмы меняются редко
+        "film_details": CacheTTL(soft=30 * 60, hard=60 * 60),
+        # тела расширенного поиска почти не повторяются
+        "advanced_search_films": CacheTTL(soft=60, hard=2 * 60),
+        "advanced_search_persons": CacheTTL(soft=60, hard=2 * 60),
+    }
+    CACHE_TTL_BY_INDEX: dict[str, CacheTTL] = {
+        # жанры почти не меняются
+        "genres": CacheTTL(soft=60 * 60, hard=24 * 60 * 60),
+    }
+    # Подстройка мягкого TTL классов ключей (эндпоинтов и индексов)
+    # по попаданиям и изменениям индексов: как часто, сколько попаданий
+    # за интервал нужно для увеличения TTL и в каких пределах (доли
+    # TTL из таблицы) он меняется
+    CACHE_TTL_ADAPTIVE: bool = False
+    CACHE_TTL_ADAPTIVE_INTERVAL_IN_SECONDS: int = 5 * 60
+    CACHE_TTL_ADAPTIVE_MIN_HITS: int = 100
+    CACHE_TTL_ADAPTIVE_MIN_FACTOR: float = 0.25
+    CACHE_TTL_ADAPTIVE_MAX_FACTOR: float = 8.0
+    # Сколько хранится отметка об отсутствии результата (пустой поиск,
+    # неизвестный UUID), 0 - не кэшировать
+    CACHE_NEGATIVE_IN_SECONDS: int = 30
+    # Аренда на пересчет записи кэша: время жизни аренды, сколько другие
+    # воркеры ждут свежее значение и как часто его проверяют
+    CACHE_LEASE_TTL_MS: int = 5000
+    CACHE_LEASE_WAIT_MS: int = 1000
+    CACHE_LEASE_POLL_MS: int = 50
+    # Кэш готовых ответов GET (тела ответов отдаются из Redis как есть)
+    CACHE_RESPONSES: bool = False
+    # Без кэша ответов хранить в Redis только ETag ответов GET, чтобы
+    # отвечать 304 на If-None-Match без сборки ответа
+    CACHE_RESPONSE_ETAGS: bool = True
+    # Фоновая запись в кэш: размер очереди (0 - писать сразу), что делать
+    # при заполненной очереди (drop_new, drop_oldest, write_through),
+    # сколько записей сохранять за раз и сколько ждать дозаписи очереди
+    # при остановке
+    CACHE_WRITE_QUEUE_SIZE: int = 1000
+    CACHE_WRITE_DROP_POLICY: Literal[
+        "drop_new", "drop_oldest", "write_through"
+    ] = "drop_new"
+    CACHE_WRITE_BATCH_SIZE: int = 100
+    CACHE_WRITE_FLUSH_TIMEOUT_MS: int = 5000
+    # Локальный кэш первого уровня (в каждом воркере), 0 записей - отключен
+    CACHE_L1_MAX_ENTRIES: int = 1024
+    CACHE_L1_MAX_BYTES: int = 32 * 1024 * 1024  # 32 Мб
+    CACHE_L1_TTL_IN_SECONDS: int = 10
+    # Удаление записей L1 при изменении их ключей в Redis: off (записи
+    # живут CACHE_L1_TTL_IN_SECONDS), tracking (CLIENT TRACKING, Redis 6+)
+    # или pubsub (воркеры сами рассылают записанные ключи). С инвалидацией
+    # CACHE_L1_TTL_IN_SECONDS можно увеличить
+    CACHE_L1_INVALIDATION: Literal["off", "tracking", "pubsub"] = "off"
+    # Фильтры Блума UUID документов (в каждом воркере): доля ложных
+    # срабатываний, лимит памяти на индекс, как часто проверяется версия
+    # индекса и как часто фильтр перестраивается в любом случае. По
+    # умолчанию выключены: новый документ до ближайшей проверки версии
+    # (до CACHE_BLOOM_CHECK_IN_SECONDS) отдает 404 во всех воркерах, кроме
+    # получившего его UUID через /api/internal/cache/invalidate
+    CACHE_BLOOM_ENABLED: bool = False
+    CACHE_BLOOM_ERROR_RATE: float = 0.001
+    CACHE_BLOOM_MAX_BYTES: int = 4 * 1024 * 1024  # 4 Мб
+    CACHE_BLOOM_CHECK_IN_SECONDS: int = 30
+    CACHE_BLOOM_REBUILD_IN_SECONDS: int = 60 * 60
+    # Допуск в кэш записей операций (вторая часть ключа кэша) по частоте:
+    # сохраняются ключи, к которым обращались больше CACHE_ADMISSION_MIN_HITS
+    # раз, и значения не больше CACHE_ADMISSION_FREE_BYTES. Частоты
+    # считаются в count-min sketch из CACHE_ADMISSION_WIDTH счетчиков
+    # на строку и делятся пополам каждые CACHE_ADMISSION_SAMPLE_SIZE
+    # обращений
+    CACHE_ADMISSION_OPERATIONS: list[str] = ["advanced_search"]
+    CACHE_ADMISSION_MIN_HITS: int = 1
+    CACHE_ADMISSION_FREE_BYTES: int = 256
+    CACHE_ADMISSION_WIDTH: int = 16 * 1024
+    CACHE_ADMISSION_SAMPLE_SIZE: int = 100_000
+    # Адреса purge прокси, кэширующих ответы (запрос PURGE с заголовком
+    # Surrogate-Key), local - локальная заглушка, и таймаут запроса purge.
+    # nginx из docker-compose ответы не кэширует: purge он не поддерживает
+    EDGE_PURGE_URLS: list[str] = []
+    EDGE_PURGE_TIMEOUT_MS: int = 2000
+    # Предел длины заголовка Surrogate-Key: длиннее - теги документов
+    # отбрасываются (должен помещаться в proxy_buffer_size nginx)
+    EDGE_SURROGATE_KEY_MAX_BYTES: int = 4 * 1024
     # Настройки Elasticsearch
     ELASTIC_HOST: str = Field(default="127.0.0.1", alias="ES_HOST")
     ELASTIC_PORT: int = Field(default=9200, alias="ES_PORT")
     STANDART_PAGE_SIZE: int = 50
+    # Наибольший размер страницы списка
+    MAX_PAGE_SIZE: int = 1000
+    # Глубина выдачи по номеру страницы (max_result_window индексов),
+    # дальше страницы получаются только по курсору
+    MAX_RESULT_WINDOW: int = 10000
+    # Курсор закрепляет снимок индекса (point in time) на время выдачи
+    SEARCH_CURSOR_PIT: bool = False
+    SEARCH_PIT_KEEP_ALIVE: str = "1m"
+    # Размер пачки документов при выгрузке индекса (export)
+    EXPORT_BATCH_SIZE: int = 1000
+    # Наибольшее число UUID в запросе документов списком (batch)
+    BATCH_MAX_UUIDS: int = 100
     DESCRIPTION: str = (
         "Информация о фильмах, жанрах и людях, участвовавших в создании"
         "кинопроизведения"
@@ -34,5 +156,27 @@ class Settings(BaseSettings):
     JWT_SECRET: SecretStr = Field(default="Secret encode token")
     JWT_CODE: str = "utf-8"
 
+    def cache_ttl(
+        self, endpoint: str | None, index: str | None = None
+    ) -> CacheTTL:
+        """TTL записей кэша из таблицы: для эндпоинта, затем для индекса
+        (по умолчанию - общий).
+        """
+        if endpoint in self.CACHE_TTL_BY_ENDPOINT:
+            return self.CACHE_TTL_BY_ENDPOINT[endpoint]
+        if index is not None and str(index) in self.CACHE_TTL_BY_INDEX:
+            return self.CACHE_TTL_BY_INDEX[str(index)]
+        return CacheTTL(
+            soft=self.CACHE_EXPIRE_IN_SECONDS,
+            hard=self.CACHE_EXPIRE_IN_SECONDS + self.CACHE_STALE_IN_SECONDS,
+        )
+
+    def negative_cache_ttl(self) -> CacheTTL:
+        """TTL отметки об отсутствии результата (без устаревания)."""
+        return CacheTTL(
+            soft=self.CACHE_NEGATIVE_IN_SECONDS,
+            hard=self.CACHE_NEGATIVE_IN_SECONDS,
+        )
+
 
 settings = Settings()
@@ -0,0 +1,125 @@
+"""Кэширование ответов на прокси перед приложением (edge).
+
+Если заданы адреса purge, ответы, собранные из кэша, получают заголовок
+Surrogate-Key со списком тегов записей, из которых они собраны (индекс,
+списки индекса и UUID документов, см. core.cache.cache_tags),
+и Surrogate-Control с max-age по мягкому TTL эндпоинта. При изменении
+документов прокси получают запрос PURGE с заголовком Surrogate-Key
+и удаляют все ответы хотя бы с одним из переданных тегов.
+
+Адреса purge прокси задаются настройкой EDGE_PURGE_URLS. Вместо адреса
+можно указать local - локальную заглушку, которая только запоминает
+полученные теги (для тестов и разработки без прокси).
+"""
+import asyncio
+import urllib.request
+from abc import ABC, abstractmethod
+from collections import deque
+from functools import lru_cache
+
+from core.config import settings
+from core.logger import logger
+from core.metrics import metrics
+
+LOCAL_TARGET = "local"
+LOCAL_HISTORY_SIZE = 100
+
+
+def surrogate_headers(tags: list[str], max_age: int) -> dict[str, str]:
+    """Заголовки для прокси: теги ответа и время его хранения.
+
+    Без адресов purge заголовки не нужны и не отправляются. Если теги
+    не помещаются в EDGE_SURROGATE_KEY_MAX_BYTES, теги документов
+    отбрасываются: страницу списка и так удаляет тег list:<индекс>,
+    а прокси не принимает заголовки длиннее своего буфера.
+    """
+    if not settings.EDGE_PURGE_URLS:
+        return {}
+    surrogate_key = " ".join(sorted(tags))
+    if len(surrogate_key) > settings.EDGE_SURROGATE_KEY_MAX_BYTES:
+        metrics.incr("edge.surrogate_key.truncated")
+        surrogate_key = " ".join(
+            sorted(tag for tag in tags if not tag.startswith("doc:"))
+        )
+    return {
+        "Surrogate-Key": surrogate_key,
+        "Surrogate-Control": f"max-age={max(max_age, 0)}",
+    }
+
+
+class AbstractPurger(ABC):
+    """Абстрактный класс-интерфейс адресата purge"""
+
+    target: str
+
+    @abstractmethod
+    async def purge(self, keys: list[str]) -> None:
+        """Абстрактный метод удаления ответов с тегами keys"""
+
+
+class HttpPurger(AbstractPurger):
+    """Прокси, принимающий PURGE с заголовком Surrogate-Key."""
+
+    def __init__(self, url: str) -> None:
+        self.target = url
+
+    async def purge(self, keys: list[str]) -> None:
+        await asyncio.to_thread(self._send, keys)
+
+    def _send(self, keys: list[str]) -> None:
+        request = urllib.request.Request(
+            self.target,
+            method="PURGE",
+            headers={"Surrogate-Key": " ".join(keys)},
+        )
+        # ответ не 2xx urlopen выбрасывает как HTTPError
+        with urllib.request.urlopen(
+            request, timeout=settings.EDGE_PURGE_TIMEOUT_MS / 1000
+        ):
+            pass
+
+
+class LocalPurger(AbstractPurger):
+    """Заглушка прокси: запоминает последние полученные наборы тегов."""
+
+    target = LOCAL_TARGET
+
+    def __init__(self) -> None:
+        self.history: deque[list[str]] = deque(maxlen=LOCAL_HISTORY_SIZE)
+
+    async def purge(self, keys: list[str]) -> None:
+        self.history.append(keys)
+
+
+local_purger = LocalPurger()
+
+
+@lru_cache()
+def get_purgers() -> list[AbstractPurger]:
+    return [
+        local_purger if url == LOCAL_TARGET else HttpPurger(url)
+        for url in settings.EDGE_PURGE_URLS
+    ]
+
+
+async def purge_edge(keys: list[str]) -> dict[str, bool]:
+    """Рассылает purge всем прокси параллельно.
+
+    Ошибка одного прокси не мешает остальным, результат - успех
+    по каждому адресату.
+    """
+    purgers = get_purgers()
+    if not keys or not purgers:
+        return {}
+    results = await asyncio.gather(
+        *(purger.purge(keys) for purger in purgers), return_exceptions=True
+    )
+    purged = {}
+    for purger, result in zip(purgers, results):
+        purged[purger.target] = not isinstance(result, Exception)
+        if isinstance(result, Exception):
+            metrics.incr("edge.purge.failed")
+            logger.error(f"Ошибка purge {purger.target}: {result}")
+        else:
+            metrics.incr("edge.purge.sent")
+    return purged
@@ -8,6 +8,28 @@ class IndexName(str, Enum):
     movies = "movies"
     persons = "persons"
 
+    def __str__(self) -> str:
+        return str.__str__(self)
+
+
+class CacheStatus(str, Enum):
+    """Модель результата обращения к кэшу (заголовок ответа X-Cache).
+
+    BLOOM - документа точно нет в индексе по фильтру Блума,
+    BYPASS - страница снимка индекса (курсор с point in time) кэш
+    не использует.
+    """
+
+    hit = "HIT"
+    stale = "STALE"
+    miss = "MISS"
+    negative = "NEGATIVE"
+    bloom = "BLOOM"
+    bypass = "BYPASS"
+
+    def __str__(self) -> str:
+        return str.__str__(self)
+
 
 class PersonRoles(list, Enum):
     """Модель возможных названий ролей в Elasticsearch"""
@@ -51,6 +73,27 @@ class APIFilmMainDescription(str, Enum):
     response_description = "Список кинопроизведений"
 
 
+class APIFilmBatchDescription(str, Enum):
+    """Модель описания запроса фильмов по списку UUID."""
+
+    summary = "Кинопроизведения по списку UUID"
+    description = "Детальная информация о кинопроизведениях по их UUID"
+    response_description = (
+        "Список найденных кинопроизведений в порядке запроса"
+    )
+
+
+class APIFilmExportDescription(str, Enum):
+    """Модель описания выгрузки всех фильмов."""
+
+    summary = "Выгрузка кинопроизведений"
+    description = (
+        "Все кинопроизведения потоком в формате NDJSON (документ на строку), "
+        "со сжатием gzip, если клиент его принимает (Accept-Encoding)"
+    )
+    response_description = "Кинопроизведения в формате NDJSON"
+
+
 class APIGenreByUUIDDescription(str, Enum):
     """Модель описания запроса жанра по UUID"""
 
@@ -67,15 +110,47 @@ class APIGenreMainDescription(str, Enum):
     response_description = "Список всех жанров"
 
 
+class APIGenreBatchDescription(str, Enum):
+    """Модель описания запроса жанров по списку UUID."""
+
+    summary = "Жанры по списку UUID"
+    description = "Информация о жанрах по их UUID"
+    response_description = "Список найденных жанров в порядке запроса"
+
+
 class APICommonDescription(str, Enum):
     """Модель описания общих полей-параметров к энпоинтам API."""
 
     page_number = "Номер страницы"
     page_size = "Количество результатов на странице"
+    fields = "Поля документов через запятую (по умолчанию все)"
+    cursor = (
+        "Курсор следующей страницы из заголовка X-Next-Cursor "
+        "предыдущего ответа (page_number при этом не учитывается)"
+    )
     query = "Строка запроса для поиска по наименованию"
     sort = "Поле сортировки (например, -name)"
 
 
+class APIPersonExportDescription(str, Enum):
+    """Модель описания выгрузки всех персон"""
+
+    summary = "Выгрузка персон"
+    description = (
+        "Все персоны потоком в формате NDJSON (документ на строку), "
+        "со сжатием gzip, если клиент его принимает (Accept-Encoding)"
+    )
+    response_description = "Персоны в формате NDJSON"
+
+
+class APIPersonBatchDescription(str, Enum):
+    """Модель описания запроса персон по списку UUID"""
+
+    summary = "Персоны по списку UUID"
+    description = "Детальная информация о персонах по их uuid"
+    response_description = "Список найденных персон в порядке запроса"
+
+
 class APIPersonByUUIDDescription(str, Enum):
     """Модель описания запроса персон по UUID"""
 
@@ -119,6 +194,10 @@ class ErrorMessage(str, Enum):
     genres_not_found = "Жанры не найдены"
     person_not_found = "Персона не найдена"
     persons_not_found = "Персоны не найдены"
+    invalid_cursor = "Неверный курсор страницы"
+    expired_cursor = "Курсор страницы устарел"
+    page_too_deep = "Слишком глубокая страница, используйте курсор (cursor)"
+    unknown_fields = "Неизвестные поля"
 
     def __str__(self) -> str:
         return str.__str__(self)
@@ -42,6 +42,15 @@ BOOL = """"%(bool_operator)s": [%(bool)s]"""
 # значения передаются параметром sorts: dict
 SORT = """{"%(key)s": {"order": "%(value)s"}}"""
 
+# последнее поле сортировки: с ним порядок документов однозначен
+# (в отличие от _doc, он не зависит от шарда, реплики и слияния
+# сегментов), и курсор (search_after) не пропускает и не повторяет их
+SORT_TIEBREAKER = """{"uuid": {"order": "asc"}}"""
+
+# сортировка по релевантности, если поле сортировки не задано
+# (равные по релевантности документы идут по uuid)
+SORT_RELEVANCE = """{"_score": {"order": "desc"}}, %s""" % SORT_TIEBREAKER
+
 # шаблон верхнего уровня
 # значения передаются параметрами from_: int, size: int, sort: str, bool: str
 # sort = "SORT, SORT..."
@@ -3,3 +3,17 @@
 
 class ElasticsearchError(Exception):
     pass
+
+
+class BadRequestError(Exception):
+    """Параметры запроса не подходят для его выполнения (ответ 400)."""
+
+
+class PaginationError(BadRequestError):
+    """Страница списка не может быть получена: неверный или устаревший
+    курсор, слишком глубокая страница.
+    """
+
+
+class UnknownFieldsError(BadRequestError):
+    """В запросе указаны поля, которых нет у модели."""
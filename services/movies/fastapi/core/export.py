@@ -0,0 +1,68 @@
+"""Потоковая выгрузка документов индекса в NDJSON.
+
+Документы читаются из снимка индекса (point in time) пачками
+по EXPORT_BATCH_SIZE через search_after (см. AbstractStorage.iter_batches),
+и каждая пачка сразу уходит клиенту: в памяти воркера не больше одной
+пачки, сколько бы документов ни было в индексе. Если клиент принимает
+gzip (Accept-Encoding), поток сжимается по мере отправки.
+"""
+import zlib
+from typing import AsyncIterator
+
+import orjson
+from core.metrics import metrics
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# wbits для zlib: формат gzip (16) с окном 32 КБ (15)
+GZIP_WBITS = 16 + 15
+
+
+def accepts_gzip(request: Request) -> bool:
+    """Принимает ли клиент ответ, сжатый gzip."""
+    encodings = request.headers.get("accept-encoding", "")
+    return any(
+        encoding.split(";")[0].strip() == "gzip"
+        for encoding in encodings.split(",")
+    )
+
+
+async def ndjson_chunks(
+    batches: AsyncIterator[list[dict]], name: str
+) -> AsyncIterator[bytes]:
+    """Пачки документов в виде строк NDJSON, по куску на пачку."""
+    documents = 0
+    async for batch in batches:
+        documents += len(batch)
+        yield b"".join(orjson.dumps(document) + b"\n" for document in batch)
+    metrics.incr(f"export.{name}.documents", documents)
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Сжатие потока gzip по кускам."""
+    compressor = zlib.compressobj(wbits=GZIP_WBITS)
+    async for chunk in chunks:
+        if data := compressor.compress(chunk):
+            yield data
+    yield compressor.flush()
+
+
+def export_response(
+    request: Request, batches: AsyncIterator[list[dict]], name: str
+) -> StreamingResponse:
+    """Ответ с выгрузкой: NDJSON, сжатый gzip, если клиент его принимает.
+    Ответ не кэшируется и не буферизуется прокси.
+    """
+    chunks = ndjson_chunks(batches, name)
+    headers = {
+        "Cache-Control": "no-store",
+        "Vary": "Accept-Encoding",
+        "X-Accel-Buffering": "no",
+    }
+    if accepts_gzip(request):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        chunks, media_type=NDJSON_MEDIA_TYPE, headers=headers
+    )
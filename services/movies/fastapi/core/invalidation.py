@@ -0,0 +1,155 @@
+"""Рассылка воркерам ключей Redis, значения которых изменились.
+
+Локальный кэш воркера (L1) может держать записи долго и без обращения
+к Redis, только если узнает об изменении ключа сразу. Источник событий
+выбирается настройкой CACHE_L1_INVALIDATION:
+
+- tracking - серверная инвалидация Redis 6+ (CLIENT TRACKING в режиме
+  BCAST по префиксу записей кэша с перенаправлением в pub/sub канал
+  __redis__:invalidate): Redis сообщает о любом изменении, удалении
+  или истечении ключа, кем бы оно ни было сделано, и о FLUSHALL;
+- pubsub - запасной вариант для Redis без tracking: RedisService сам
+  публикует измененные ключи в канал CACHE_KEY_PREFIX:invalidate,
+  поэтому изменения в обход приложения и истечение TTL не видны.
+
+Пока подписка не установлена (запуск, обрыв соединения), слушатель
+считается отключенным и L1 не используется.
+"""
+import asyncio
+import uuid
+from typing import Callable
+
+import orjson
+from core.config import settings
+from core.logger import logger
+from core.metrics import metrics
+from redis.asyncio import Redis
+
+TRACKING_CHANNEL = "__redis__:invalidate"
+PUBSUB_CHANNEL = f"{settings.CACHE_KEY_PREFIX}:invalidate"
+# Префикс записей кэша всех кодеков текущей версии формата ключей
+TRACKED_PREFIX = f"{settings.CACHE_KEY_PREFIX}:v{settings.CACHE_KEY_VERSION}:"
+HEALTH_CHECK_IN_SECONDS = 5
+RECONNECT_IN_SECONDS = 1
+
+# Получает полные ключи Redis или None, если сбросить нужно все
+InvalidationCallback = Callable[[list[bytes] | None], None]
+
+
+class InvalidationListener:
+    """Фоновая подписка на изменения ключей кэша в Redis."""
+
+    def __init__(self) -> None:
+        self.connected = False
+        self._callbacks: list[InvalidationCallback] = []
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.CACHE_L1_INVALIDATION != "off"
+
+    def subscribe(self, callback: InvalidationCallback) -> None:
+        self._callbacks.append(callback)
+
+    async def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _notify(self, keys: list[bytes] | None) -> None:
+        metrics.incr("cache.invalidation.messages")
+        for callback in self._callbacks:
+            callback(keys)
+
+    def _set_connected(self, connected: bool) -> None:
+        self.connected = connected
+        metrics.set_gauge("cache.invalidation.connected", int(connected))
+        if not connected:
+            # за время обрыва могли пропасть сообщения
+            self._notify(None)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.incr("cache.invalidation.reconnects")
+                logger.error(f"Ошибка подписки на инвалидацию кэша: {e}")
+            finally:
+                self._set_connected(False)
+            await asyncio.sleep(RECONNECT_IN_SECONDS)
+
+    async def _listen(self) -> None:
+        name = f"{settings.CACHE_KEY_PREFIX}-invalidation-{uuid.uuid4().hex}"
+        client = Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            client_name=name,
+        )
+        pubsub = client.pubsub()
+        tracker = None
+        try:
+            if settings.CACHE_L1_INVALIDATION == "tracking":
+                await pubsub.subscribe(TRACKING_CHANNEL)
+                tracker = await self._start_tracking(client, name)
+                tracker_id = await tracker.client_id()
+            else:
+                await pubsub.subscribe(PUBSUB_CHANNEL)
+            self._set_connected(True)
+            loop = asyncio.get_running_loop()
+            checked_at = loop.time()
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=HEALTH_CHECK_IN_SECONDS,
+                )
+                if message and message["type"] == "message":
+                    self._notify(self._parse(message))
+                if loop.time() - checked_at >= HEALTH_CHECK_IN_SECONDS:
+                    checked_at = loop.time()
+                    # tracking привязан к соединению: после переподключения
+                    # клиента у соединения другой id и tracking выключен
+                    if tracker and await tracker.client_id() != tracker_id:
+                        raise ConnectionError("Соединение tracking потеряно")
+        finally:
+            await pubsub.aclose()
+            await client.aclose()
+            if tracker:
+                await tracker.aclose()
+
+    @staticmethod
+    async def _start_tracking(client: Redis, name: str) -> Redis:
+        """Включает tracking на отдельном соединении с перенаправлением
+        сообщений в соединение подписки (его находим по имени клиента).
+        """
+        clients = await client.client_list(_type="pubsub")
+        pubsub_id = next(
+            int(info["id"]) for info in clients if info["name"] == name
+        )
+        tracker = Redis(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            single_connection_client=True,
+        )
+        await tracker.client_tracking_on(
+            clientid=pubsub_id, bcast=True, prefix=[TRACKED_PREFIX]
+        )
+        return tracker
+
+    @staticmethod
+    def _parse(message: dict) -> list[bytes] | None:
+        data = message["data"]
+        if message["channel"] == PUBSUB_CHANNEL.encode():
+            return [key.encode() for key in orjson.loads(data)]
+        # в канале tracking приходит список ключей, при FLUSHALL - nil
+        return data
+
+
+invalidation_listener = InvalidationListener()
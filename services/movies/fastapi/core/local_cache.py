@@ -0,0 +1,69 @@
+"""Локальный (in-process) кэш первого уровня."""
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LocalLRUCache:
+    """LRU-кэш в памяти воркера с ограничением по числу записей,
+    суммарному размеру и времени жизни записей.
+
+    Размер записи передаётся вызывающей стороной (обычно это длина
+    сериализованного значения), сам кэш объекты не измеряет.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size_bytes = 0
+        self.evictions = 0
+        # key -> (value, size, expire_at)
+        self._data: OrderedDict[Hashable, tuple[Any, int, float]] = (
+            OrderedDict()
+        )
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Any | None:
+        """Возвращает значение по ключу или None, если его нет
+        или время жизни записи истекло.
+        """
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, _, expire_at = item
+        if expire_at <= time.monotonic():
+            self.delete(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        """Сохраняет значение, вытесняя самые давно использованные записи
+        при превышении лимитов. Значения крупнее max_bytes не кэшируются.
+        """
+        self.delete(key)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        self._data[key] = (value, size, time.monotonic() + self.ttl)
+        self.size_bytes += size
+        while (
+            len(self._data) > self.max_entries
+            or self.size_bytes > self.max_bytes
+        ):
+            _, (_, evicted_size, _) = self._data.popitem(last=False)
+            self.size_bytes -= evicted_size
+            self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Удаляет запись по ключу, если она есть."""
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.size_bytes -= item[1]
+
+    def clear(self) -> None:
+        """Очищает кэш."""
+        self._data.clear()
+        self.size_bytes = 0
@@ -0,0 +1,33 @@
+"""Метрики приложения.
+
+Счётчики хранятся в памяти процесса, поэтому каждый воркер gunicorn
+ведёт собственную статистику.
+"""
+from collections import Counter
+
+
+class Metrics:
+    """Набор именованных счётчиков и показателей (gauge) процесса."""
+
+    def __init__(self) -> None:
+        self._counters: Counter[str] = Counter()
+        self._gauges: dict[str, float] = {}
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """Увеличивает счётчик name на value."""
+        self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Устанавливает текущее значение показателя name."""
+        self._gauges[name] = value
+
+    def value(self, name: str) -> float:
+        """Возвращает текущее значение счётчика name."""
+        return self._counters[name]
+
+    def snapshot(self) -> dict[str, float]:
+        """Возвращает копию всех счётчиков и показателей."""
+        return {**self._counters, **self._gauges}
+
+
+metrics = Metrics()
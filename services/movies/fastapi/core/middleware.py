@@ -0,0 +1,29 @@
+"""ASGI middleware приложения."""
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class CacheStatusMiddleware:
+    """Добавляет в ответ заголовок X-Cache с результатом обращения к кэшу
+    (значение core.enum.CacheStatus), который сервис записал
+    в request.state.cache_status.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_status(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status = scope.get("state", {}).get("cache_status")
+                if status:
+                    message["headers"] = [
+                        *message.get("headers", []),
+                        (b"x-cache", str(status).encode()),
+                    ]
+            await send(message)
+
+        await self.app(scope, receive, send_with_status)
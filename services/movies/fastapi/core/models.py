@@ -1,5 +1,6 @@
 """Конфигурационные модели."""
 from enum import Enum
+from typing import Any
 from uuid import UUID
 
 import orjson
@@ -30,6 +31,19 @@ class Base(OrjsonDumps):
         abstract = True
 
 
+class CachedPage(OrjsonDumps):
+    """Страница списка в кэше: UUID документов по порядку и общее число
+    найденных документов. Сами документы хранятся в кэше документов.
+
+    after - значения сортировки последнего документа полной страницы
+    для курсора следующей страницы (см. core.pagination).
+    """
+
+    uuids: list[UUID]
+    total: int
+    after: list[Any] | None = None
+
+
 class SortOrder(str, Enum):
     """Модель сортировки результатов API."""
 
@@ -0,0 +1,71 @@
+"""Выдача списков по курсору (search_after).
+
+Номер страницы переводится в from запроса в Elasticsearch: чем глубже
+страница, тем дороже запрос, а дальше MAX_RESULT_WINDOW документов
+Elasticsearch не отдает вовсе. Курсор продолжает выдачу после последнего
+документа предыдущей страницы (search_after по значениям его
+сортировки), поэтому стоимость страницы от глубины не зависит. Чтобы
+порядок документов был однозначным, сортировка списков (и заданная,
+и по релевантности) дополняется полем uuid.
+
+Для клиента курсор непрозрачен: это base64 от значений сортировки
+последнего документа, отпечатка запроса (курсор нельзя применить
+к другому запросу) и, с SEARCH_CURSOR_PIT, id point in time - снимка
+индекса, по которому идет вся выдача.
+"""
+import base64
+import binascii
+import hashlib
+from typing import Any
+
+import orjson
+
+from core.enum import ErrorMessage
+from core.exceptions import PaginationError
+
+# параметры запроса, которые меняются от страницы к странице
+PAGE_PARAMS = ("from", "size", "search_after", "pit")
+
+
+def query_fingerprint(index: str, query: dict) -> str:
+    """Отпечаток запроса в Elasticsearch без параметров страницы."""
+    params = {
+        key: value for key, value in query.items() if key not in PAGE_PARAMS
+    }
+    normalized = orjson.dumps([index, params], option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(normalized, digest_size=8).hexdigest()
+
+
+class Cursor:
+    """Позиция выдачи: значения сортировки последнего выданного документа,
+    отпечаток запроса и id снимка индекса (если выдача идет по снимку).
+    """
+
+    __slots__ = ("after", "query", "pit_id")
+
+    def __init__(
+        self, after: list[Any], query: str, pit_id: str | None = None
+    ) -> None:
+        self.after = after
+        self.query = query
+        self.pit_id = pit_id
+
+    def encode(self) -> str:
+        data = orjson.dumps(
+            {"a": self.after, "q": self.query, "p": self.pit_id}
+        )
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, value: str, query: str) -> "Cursor":
+        """Разбирает курсор запроса с отпечатком query."""
+        try:
+            data = orjson.loads(
+                base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+            )
+            cursor = cls(data["a"], data["q"], data.get("p"))
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise PaginationError(ErrorMessage.invalid_cursor)
+        if cursor.query != query or not isinstance(cursor.after, list):
+            raise PaginationError(ErrorMessage.invalid_cursor)
+        return cursor
@@ -0,0 +1,101 @@
+"""Проекция документов индекса по модели ответа эндпоинта.
+
+Если у модели ответа эндпоинта нет части полей модели индекса сервиса
+(например, FilmShort для Film), из Elasticsearch запрашиваются только
+поля модели ответа (_source_includes), а документы собираются сразу
+в нее. Записи таких документов хранятся в кэше отдельно от полных
+документов: имя проекции входит в ключ записи (см. EntityCache.key).
+
+Модели ответа с теми же полями, что у модели индекса, и отличием только
+во вложенных полях (например, PersonFilms для Person) собираются
+из полных документов: экономия на вложенных полях меньше, чем
+от общей с другими эндпоинтами записи документа в кэше.
+"""
+import hashlib
+import types
+from functools import lru_cache
+from typing import Any, Union, get_args, get_origin
+
+from core.enum import ErrorMessage
+from core.exceptions import UnknownFieldsError
+from pydantic import BaseModel
+
+
+def _item_type(annotation: Any) -> Any:
+    """Тип элемента: list[X], X | None и list[X] | None дают X."""
+    origin = get_origin(annotation)
+    if origin in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return _item_type(args[0]) if len(args) == 1 else annotation
+    if origin is list:
+        return _item_type(get_args(annotation)[0])
+    return annotation
+
+
+def _is_model(annotation: Any) -> bool:
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def source_fields(model: type[BaseModel], prefix: str = "") -> list[str]:
+    """Пути полей модели в документе, вложенные модели - по их полям."""
+    fields = []
+    for name, field in model.model_fields.items():
+        item = _item_type(field.annotation)
+        if _is_model(item):
+            fields.extend(source_fields(item, f"{prefix}{name}."))
+        else:
+            fields.append(f"{prefix}{name}")
+    return fields
+
+
+def field_paths(model: type[BaseModel], names: list[str]) -> list[str]:
+    """Пути в документе полей модели names (вложенные модели - по их
+    полям), например для выгрузки части полей.
+    """
+    if unknown := set(names) - set(model.model_fields):
+        raise UnknownFieldsError(
+            f"{ErrorMessage.unknown_fields}: {', '.join(sorted(unknown))}"
+        )
+    paths = []
+    for name in names:
+        item = _item_type(model.model_fields[name].annotation)
+        if _is_model(item):
+            paths.extend(source_fields(item, f"{name}."))
+        else:
+            paths.append(name)
+    return paths
+
+
+class Projection:
+    """Модель, в которую собираются документы, пути ее полей и имя
+    проекции для ключей кэша (у полных документов - None).
+    """
+
+    __slots__ = ("model", "fields", "name")
+
+    def __init__(self, model: type[BaseModel], full: bool = False) -> None:
+        self.model = model
+        self.fields = None if full else source_fields(model)
+        self.name = (
+            None
+            if full
+            else hashlib.blake2b(
+                ",".join(self.fields).encode(), digest_size=4
+            ).hexdigest()
+        )
+
+
+@lru_cache()
+def get_projection(response_model: Any, model: type[BaseModel]) -> Projection:
+    """Проекция документов модели индекса для модели ответа эндпоинта.
+
+    Полные документы нужны, если модель ответа не является моделью,
+    содержит поля, которых у модели индекса нет (эндпоинт сам
+    преобразует документы), или содержит все ее поля.
+    """
+    item = _item_type(response_model)
+    if not _is_model(item) or not set(item.model_fields) < set(
+        model.model_fields
+    ):
+        return Projection(model, full=True)
+    return Projection(item)
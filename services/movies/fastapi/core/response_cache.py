@@ -0,0 +1,290 @@
+"""Кэш готовых ответов API и условные GET-запросы.
+
+При попадании тело ответа отдается из Redis как есть, без десериализации
+в модели, валидации по response_model и повторной сериализации.
+Включается настройкой CACHE_RESPONSES для роутеров с route_class
+CachedResponseRoute, кэшируются только успешные ответы на GET.
+
+Успешные ответы на GET этих роутеров (независимо от CACHE_RESPONSES)
+получают строгий ETag - хэш тела ответа - и Cache-Control с max-age
+по TTL кэша эндпоинта, а запрос с совпавшим If-None-Match получает
+304 Not Modified. ETag хранится вместе с телом в записи кэша ответов,
+а без него (CACHE_RESPONSE_ETAGS) - в отдельной небольшой записи,
+поэтому 304 отдается без сборки ответа.
+
+Запись ответа помечается теми же тегами, что и записи кэша, из которых
+он собран (их сервис сохраняет в request.state.cache_tags), поэтому
+инвалидация документов удаляет и зависящие от них ответы. Эти же теги
+уходят прокси в заголовке Surrogate-Key (см. core.edge).
+
+Курсор следующей страницы списка (см. core.pagination) отдается
+в заголовке X-Next-Cursor и хранится в записи вместе с ответом.
+"""
+import hashlib
+import time
+from functools import lru_cache
+from http import HTTPStatus
+from typing import Any, Callable
+
+from core.cache import ENTRY_HEADER, RedisService, build_cache_key, jittered
+from core.codecs import get_codec
+from core.compression import get_compressor
+from core.config import CacheTTL, settings
+from core.edge import surrogate_headers
+from core.enum import CacheStatus
+from core.metrics import metrics
+from db import redis
+from fastapi import Request, Response
+from fastapi.dependencies.utils import (
+    get_flat_dependant,
+    request_params_to_args,
+)
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from starlette.background import BackgroundTask
+
+
+def content_etag(body: bytes) -> str:
+    """Строгий ETag тела ответа."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Совпадает ли ETag с заголовком If-None-Match (слабое сравнение,
+    как требует RFC 9110 для If-None-Match).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        tag.strip().removeprefix("W/") == etag
+        for tag in if_none_match.split(",")
+    )
+
+
+def validator_headers(etag: str, max_age: int) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": f"max-age={max(max_age, 0)}"}
+
+
+def cursor_headers(next_cursor: str | None) -> dict[str, str]:
+    return {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+
+class CachedResponse:
+    """Сохраненный ответ: тело, тип содержимого, ETag, теги, курсор
+    следующей страницы и момент истечения свежести.
+    """
+
+    __slots__ = (
+        "body",
+        "media_type",
+        "etag",
+        "tags",
+        "next_cursor",
+        "expire_at",
+    )
+
+    def __init__(
+        self,
+        body: bytes,
+        media_type: str,
+        etag: str,
+        tags: list[str],
+        next_cursor: str | None,
+        expire_at: float,
+    ) -> None:
+        self.body = body
+        self.media_type = media_type
+        self.etag = etag
+        self.tags = tags
+        self.next_cursor = next_cursor
+        self.expire_at = expire_at
+
+    @property
+    def max_age(self) -> int:
+        return int(self.expire_at - time.time())
+
+
+class ResponseCache:
+    """Ответы в Redis: заголовок записи кэша, затем тип содержимого,
+    ETag, теги через пробел, курсор следующей страницы (пустой, если
+    его нет) и тело ответа, разделенные переводом строки. В записи
+    только с ETag тип содержимого и тело пустые.
+    """
+
+    def __init__(self, remote: RedisService) -> None:
+        self.remote = remote
+
+    @staticmethod
+    def key(endpoint: str, params: dict[str, Any], body: bool = True) -> str:
+        """Ключ ответа по разобранным параметрам эндпоинта (со значениями
+        по умолчанию): запросы, отличающиеся только записью параметров,
+        получают один ключ. Записи только с ETag (body=False) хранятся
+        отдельно от записей с телом.
+        """
+        operation = "response" if body else "etag"
+        return build_cache_key(operation, endpoint, params=params)
+
+    async def get(self, key: str) -> CachedResponse | None:
+        """Возвращает свежий ответ."""
+        data = await self.remote.get_raw(key)
+        if not data:
+            return None
+        expire_at, _ = ENTRY_HEADER.unpack_from(data)
+        if time.time() >= expire_at:
+            return None
+        media_type, etag, tags, next_cursor, body = bytes(
+            data[ENTRY_HEADER.size :]
+        ).split(b"\n", 4)
+        return CachedResponse(
+            body,
+            media_type.decode(),
+            etag.decode(),
+            tags.decode().split(),
+            next_cursor.decode() or None,
+            expire_at,
+        )
+
+    async def put(
+        self,
+        key: str,
+        body: bytes,
+        media_type: str,
+        etag: str,
+        ttl: CacheTTL,
+        tags: list[str],
+        next_cursor: str | None = None,
+    ) -> None:
+        """Сохраняет ответ до мягкого TTL: устаревшие ответы не отдаются."""
+        ttl = CacheTTL(soft=ttl.soft, hard=ttl.soft)
+        header = ENTRY_HEADER.pack(time.time() + jittered(ttl.soft), 0.0)
+        value = b"\n".join(
+            (
+                header + media_type.encode(),
+                etag.encode(),
+                " ".join(tags).encode(),
+                (next_cursor or "").encode(),
+                body,
+            )
+        )
+        await self.remote.set_raw(key, value, ttl, tags)
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    return ResponseCache(
+        RedisService(
+            redis.redis,
+            codec=get_codec(settings.CACHE_CODEC),
+            compressor=get_compressor(settings.CACHE_COMPRESSION),
+        )
+    )
+
+
+class CachedResponseRoute(APIRoute):
+    """Маршрут с ETag и условными GET-запросами, отдающий ответы
+    из кэша готовых ответов. Модель ответа маршрута передается сервису
+    в request.state.response_model (см. core.projection).
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        endpoint = self.endpoint.__name__
+        # параметры пути и запроса эндпоинта вместе с его зависимостями
+        dependant = get_flat_dependant(self.dependant, skip_repeats=True)
+
+        def resolve_params(request: Request) -> dict[str, Any] | None:
+            """Параметры запроса, как их получит эндпоинт (None - запрос
+            с ошибками, его ответ не кэшируется).
+            """
+            path, path_errors = request_params_to_args(
+                dependant.path_params, request.path_params
+            )
+            query, query_errors = request_params_to_args(
+                dependant.query_params, request.query_params
+            )
+            if path_errors or query_errors:
+                return None
+            return {**path, **query}
+
+        async def cached_handler(request: Request) -> Response:
+            # по модели ответа сервис выбирает проекцию документов
+            request.state.response_model = self.response_model
+            if request.method != "GET":
+                return await handler(request)
+            if_none_match = request.headers.get("if-none-match")
+            # без кэша ответов хранится только ETag ответа: запрос
+            # с совпавшим If-None-Match получает 304 без сборки ответа
+            with_body = settings.CACHE_RESPONSES
+            params = (
+                resolve_params(request)
+                if with_body or settings.CACHE_RESPONSE_ETAGS
+                else None
+            )
+            cache = get_response_cache() if params is not None else None
+            if cache:
+                key = cache.key(endpoint, params, body=with_body)
+            if cache and (with_body or if_none_match):
+                cached = await cache.get(key)
+                if cached and (
+                    with_body or etag_matches(if_none_match, cached.etag)
+                ):
+                    metrics.incr("cache.response.hit")
+                    request.state.cache_status = CacheStatus.hit
+                    headers = validator_headers(cached.etag, cached.max_age)
+                    headers.update(
+                        surrogate_headers(cached.tags, cached.max_age)
+                    )
+                    headers.update(cursor_headers(cached.next_cursor))
+                    if etag_matches(if_none_match, cached.etag):
+                        metrics.incr("cache.response.not_modified")
+                        return Response(
+                            status_code=HTTPStatus.NOT_MODIFIED,
+                            headers=headers,
+                        )
+                    return Response(
+                        cached.body,
+                        media_type=cached.media_type,
+                        headers=headers,
+                    )
+                metrics.incr("cache.response.miss")
+            response = await handler(request)
+            # потоковый ответ (выгрузка) отдается как есть
+            if response.status_code != HTTPStatus.OK or isinstance(
+                response, StreamingResponse
+            ):
+                return response
+            etag = content_etag(response.body)
+            # TTL записей, из которых собран ответ (см. core.ttl_policy)
+            ttl = getattr(request.state, "cache_ttl", None)
+            ttl = ttl or settings.cache_ttl(endpoint)
+            headers = validator_headers(etag, ttl.soft)
+            tags = getattr(request.state, "cache_tags", None)
+            if tags:
+                headers.update(surrogate_headers(tags, ttl.soft))
+            next_cursor = getattr(request.state, "next_cursor", None)
+            headers.update(cursor_headers(next_cursor))
+            response.headers.update(headers)
+            if cache and tags and response.background is None:
+                # ответ сохраняется после отправки клиенту
+                response.background = BackgroundTask(
+                    cache.put,
+                    key,
+                    response.body if with_body else b"",
+                    response.media_type if with_body else "",
+                    etag,
+                    ttl,
+                    sorted(tags),
+                    next_cursor,
+                )
+            if etag_matches(if_none_match, etag):
+                metrics.incr("cache.response.not_modified")
+                return Response(
+                    status_code=HTTPStatus.NOT_MODIFIED,
+                    headers=headers,
+                    background=response.background,
+                )
+            return response
+
+        return cached_handler
@@ -1,10 +1,23 @@
 """Общие сервисы для эндроинтов API."""
 
+import asyncio
 import json  # noqa
+import time
+from functools import partial
+from typing import Any, AsyncIterator, Awaitable, Callable
 from uuid import UUID
 
-from core.cache import AbstractCacheService
-from core.config import settings
+import orjson
+from core.bloom import uuid_filters
+from core.cache import (
+    AbstractCacheService,
+    CacheEntry,
+    EntityCache,
+    build_cache_key,
+    cache_tags,
+)
+from core.config import CacheTTL, settings
+from core.enum import CacheStatus, ErrorMessage
 from core.es_queries import (
     BOOL,
     MATCH_ALL,
@@ -12,9 +25,24 @@ from core.es_queries import (
     NESTED_QUERY_MUST,
     QUERY_BASE,
     SORT,
+    SORT_RELEVANCE,
+    SORT_TIEBREAKER,
+)
+from core.exceptions import PaginationError
+from core.logger import logger
+from core.metrics import metrics
+from core.models import CachedPage, SortOrder
+from core.pagination import Cursor, query_fingerprint
+from core.projection import (
+    Projection,
+    field_paths,
+    get_projection,
+    source_fields,
 )
-from core.models import SortOrder
+from core.singleflight import SingleFlight
 from core.storage import ElasticService
+from core.ttl_policy import ttl_policy
+from core.write_queue import cache_writer
 from fastapi import Request
 from pydantic import BaseModel
 
@@ -31,22 +59,63 @@ class CommonService:
         self.elastic = elastic
         self.model = model
         self.index = index
+        self.entities = EntityCache(cache)
+        self.single_flight = SingleFlight(name=index)
+        # ссылки на задачи фонового обновления, чтобы их не собрал GC
+        self._refresh_tasks: set[asyncio.Task] = set()
 
     async def get_by_uuid(
         self, uuid: UUID, request: Request
     ) -> BaseModel | None:
         """Метод поиска в индексе по UUID."""
-        if instances := await self.cache.get_instances_from_cache(
-            request=request, model=self.model
+        if not uuid_filters.might_contain(self.index, uuid):
+            self._set_cache_status(request, CacheStatus.bloom)
+            return None
+        projection = self._get_projection(request)
+
+        async def load() -> list[BaseModel]:
+            instance = await self.elastic.get_one_by_id(
+                index=self.index,
+                model_class=projection.model,
+                uuid=uuid,
+                fields=projection.fields,
+            )
+            return [instance] if instance else []
+
+        key = self.entities.key(self.index, uuid, projection.name)
+        if instances := await self._get_with_cache(
+            key, load, request, model=projection.model
         ):
             return instances[-1]
-        if instance := await self.elastic.get_one_by_id(
-            index=self.index, model_class=self.model, uuid=uuid
-        ):
-            await self.cache.put_instances_to_cache(
-                request=request, instances=[instance]
-            )
-            return instance
+
+    async def get_many_by_uuids(
+        self, uuids: list[UUID], request: Request | None = None
+    ) -> list[BaseModel]:
+        """Метод получения документов по списку UUID в порядке списка.
+        Документы берутся из кэша документов, недостающие - одним mget
+        из Elasticsearch, отсутствующие в индексе пропускаются.
+        """
+        return await self._hydrate(
+            [
+                uuid
+                for uuid in uuids
+                if uuid_filters.might_contain(self.index, uuid)
+            ],
+            self._get_projection(request),
+        )
+
+    def export(
+        self, fields: list[str] | None = None
+    ) -> AsyncIterator[list[dict]]:
+        """Метод перебора пачками всех документов индекса для выгрузки:
+        только полей модели fields, если они заданы, иначе всех ее полей.
+        """
+        paths = (
+            field_paths(self.model, fields)
+            if fields
+            else source_fields(self.model)
+        )
+        return self.elastic.iter_batches(self.index, fields=paths)
 
     async def get_list(
         self,
@@ -57,12 +126,21 @@ class CommonService:
         matches: dict | None = None,
         nested_matches: dict | None = None,
         bool_operator: str = "should",
+        cursor: str | None = None,
     ) -> list[BaseModel | None]:
-        """Метод получения списка из индекса по заданным параметрам."""
-        if instances := await self.cache.get_instances_from_cache(
-            request=request, model=self.model
-        ):
-            return instances
+        """Метод получения списка из индекса по заданным параметрам.
+        Страница задается номером или курсором (см. core.pagination).
+        """
+        key = build_cache_key(
+            self.index,
+            "list",
+            page_number=page_number,
+            page_size=page_size,
+            sort=sort,
+            matches=matches,
+            nested_matches=nested_matches,
+            bool_operator=bool_operator,
+        )
         if sort:
             sort = self._get_sort(sort=sort)
         es_query = self._get_es_query(
@@ -73,14 +151,389 @@ class CommonService:
             nested_matches=nested_matches,
             bool_operator=bool_operator,
         )
-        list_instances = await self.elastic.get_list_by_search(
-            index=self.index, model_class=self.model, query=es_query
+        return await self._get_page(key, es_query, request, cursor)
+
+    async def _get_page(
+        self,
+        key: str,
+        es_query: str,
+        request: Request | None = None,
+        cursor: str | None = None,
+    ) -> list[BaseModel]:
+        """Метод получения страницы списка по запросу в Elasticsearch.
+
+        В кэше списка хранятся только UUID документов по порядку и общее
+        число найденных, а сами документы собираются из кэша документов.
+        Страница по курсору продолжает выдачу после последнего документа
+        предыдущей (search_after), курсор следующей страницы сохраняется
+        в request.state.next_cursor.
+        """
+        projection = self._get_projection(request)
+        query = orjson.loads(es_query)
+        fingerprint = query_fingerprint(self.index, query)
+        if cursor:
+            position = Cursor.decode(cursor, fingerprint)
+            query.pop("from", None)
+            query["search_after"] = position.after
+            if position.pit_id or settings.SEARCH_CURSOR_PIT:
+                return await self._get_pit_page(
+                    query, projection, fingerprint, request, position.pit_id
+                )
+            index, operation, _ = key.split(":", 2)
+            key = build_cache_key(
+                index, operation, page=key, after=position.after
+            )
+        elif query["from"] + query["size"] > settings.MAX_RESULT_WINDOW:
+            raise PaginationError(ErrorMessage.page_too_deep)
+        pages = await self._get_with_cache(
+            key,
+            partial(self._search, query, projection),
+            request,
+            model=CachedPage,
+        )
+        if not pages:
+            return []
+        self._set_next_cursor(request, pages[0].after, fingerprint)
+        return await self._hydrate(pages[0].uuids, projection)
+
+    async def _get_pit_page(
+        self,
+        query: dict,
+        projection: Projection,
+        fingerprint: str,
+        request: Request | None,
+        pit_id: str | None,
+    ) -> list[BaseModel]:
+        """Метод получения страницы по курсору из снимка индекса.
+
+        Снимок открывается на первой странице по курсору и закрывается
+        на последней. Документы снимка отдаются как есть, без кэша:
+        они нужны одному клиенту и могут быть старше документов индекса.
+        """
+        self._set_cache_status(request, CacheStatus.bypass)
+        pit_id = pit_id or await self.elastic.open_pit(self.index)
+        page = await self.elastic.get_page_by_search_after(
+            index=self.index,
+            model_class=projection.model,
+            query=query,
+            fields=projection.fields,
+            pit_id=pit_id,
+        )
+        after = self._get_after(page.instances, page.after, query)
+        if after is None:
+            await self.elastic.close_pit(page.pit_id or pit_id)
+        self._set_next_cursor(
+            request, after, fingerprint, page.pit_id or pit_id
+        )
+        return page.instances
+
+    async def _search(
+        self, query: dict, projection: Projection
+    ) -> list[CachedPage]:
+        """Метод поиска в индексе по готовому запросу в Elasticsearch."""
+        page = await self.elastic.get_page_by_search_after(
+            index=self.index,
+            model_class=projection.model,
+            query=query,
+            fields=projection.fields,
         )
-        if list_instances:
-            await self.cache.put_instances_to_cache(
-                request=request, instances=list_instances
+        list_instances = page.instances
+        if not list_instances:
+            return []
+        # найденные документы сохраняются в кэш документов,
+        # а страница ссылается на них по UUID
+        await cache_writer.put_many(
+            self.cache,
+            self.entities.items(self.index, list_instances, projection.name),
+            ttl_policy.ttl(None, self.index),
+        )
+        uuids = [instance.uuid for instance in list_instances]
+        return [
+            CachedPage(
+                uuids=uuids,
+                total=page.total,
+                after=self._get_after(list_instances, page.after, query),
             )
-        return list_instances
+        ]
+
+    @staticmethod
+    def _get_after(
+        instances: list[BaseModel], after: list[Any] | None, query: dict
+    ) -> list[Any] | None:
+        """Значения сортировки для курсора следующей страницы: только
+        у полной страницы, у неполной следующей страницы нет.
+        """
+        return after if len(instances) == query["size"] else None
+
+    @staticmethod
+    def _set_next_cursor(
+        request: Request | None,
+        after: list[Any] | None,
+        fingerprint: str,
+        pit_id: str | None = None,
+    ) -> None:
+        if request is not None and after is not None:
+            request.state.next_cursor = Cursor(
+                after, fingerprint, pit_id
+            ).encode()
+
+    async def _hydrate(
+        self, uuids: list[UUID], projection: Projection
+    ) -> list[BaseModel]:
+        """Метод сборки документов (или их проекций) по UUID: свежие
+        берутся из кэша документов одним MGET, остальные - одним mget
+        из Elasticsearch. Отсутствующие в индексе документы пропускаются.
+        """
+        cached = await self.entities.get_many(
+            self.index, uuids, projection.model, projection.name
+        )
+        documents = {
+            uuid: entry.instances[0]
+            for uuid, entry in cached.items()
+            if entry.is_fresh and entry.instances
+        }
+        missing = [uuid for uuid in uuids if str(uuid) not in documents]
+        ttl_policy.record(
+            None, self.index, hits=len(documents), misses=len(missing)
+        )
+        if missing:
+            metrics.incr(
+                f"cache.entity.{self.index}.hydrate_miss", len(missing)
+            )
+            found = await self.elastic.get_many_by_ids(
+                index=self.index,
+                model_class=projection.model,
+                uuids=missing,
+                fields=projection.fields,
+            )
+            await cache_writer.put_many(
+                self.cache,
+                self.entities.items(self.index, found, projection.name),
+                ttl_policy.ttl(None, self.index),
+            )
+            documents.update(
+                (str(instance.uuid), instance) for instance in found
+            )
+        return [
+            documents[str(uuid)] for uuid in uuids if str(uuid) in documents
+        ]
+
+    async def _get_with_cache(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[list[BaseModel]]],
+        request: Request | None = None,
+        model: BaseModel | None = None,
+    ) -> list[BaseModel]:
+        """Метод получения списка из кэша, а при промахе - через loader.
+
+        Теги записи добавляются в request.state.cache_tags, чтобы ими
+        можно было пометить и кэш готового ответа, а TTL записи -
+        в request.state.cache_ttl.
+        """
+        instances = await self._get_or_load(key, loader, request, model)
+        if request is not None:
+            tags = getattr(request.state, "cache_tags", set())
+            request.state.cache_tags = tags | set(cache_tags(key, instances))
+            request.state.cache_ttl = self._get_ttl(request)
+            hit = request.state.cache_status != CacheStatus.miss
+            ttl_policy.record(
+                self._get_endpoint(request),
+                self.index,
+                hits=int(hit),
+                misses=int(not hit),
+            )
+        return instances
+
+    async def _get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[list[BaseModel]]],
+        request: Request | None = None,
+        model: BaseModel | None = None,
+    ) -> list[BaseModel]:
+        """Метод получения списка из кэша, а при промахе - через loader.
+
+        Устаревшая запись (между мягким и жестким TTL) отдается сразу,
+        а обновляется в фоне тем же путем, что и при промахе. Свежая запись
+        может так же обновиться досрочно (CACHE_EARLY_REFRESH_BETA).
+        Одновременные промахи по одному ключу кэша объединяются:
+        в хранилище уходит один запрос, остальные ждут его результат.
+        Пустой результат хранится короткое время как негативная запись.
+        Итог (HIT, NEGATIVE, STALE или MISS) сохраняется
+        в request.state.cache_status.
+        """
+        model = model or self.model
+        entry = await self.cache.get_entry(key=key, model=model)
+        if entry and entry.is_fresh:
+            if not entry.instances:
+                metrics.incr("cache.negative.hit")
+                self._set_cache_status(request, CacheStatus.negative)
+                return entry.instances
+            self._set_cache_status(request, CacheStatus.hit)
+            if entry.should_refresh_early(settings.CACHE_EARLY_REFRESH_BETA):
+                metrics.incr("cache.early_refresh")
+                self._refresh_in_background(
+                    self._refresh(key, loader, model, request, entry)
+                )
+            return entry.instances
+        if entry and not entry.instances:
+            # устаревшая негативная запись не отдается:
+            # документ мог появиться в индексе
+            entry = None
+        refresh = self._refresh(key, loader, model, request, entry)
+        if entry:
+            self._set_cache_status(request, CacheStatus.stale)
+            self._refresh_in_background(refresh)
+            return entry.instances
+        self._set_cache_status(request, CacheStatus.miss)
+        return await refresh
+
+    def _refresh(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[list[BaseModel]]],
+        model: BaseModel,
+        request: Request | None,
+        entry: CacheEntry | None,
+    ) -> Awaitable[list[BaseModel]]:
+        """Пересчет записи, общий для одновременных запросов воркера."""
+        return self.single_flight.do(
+            key,
+            partial(
+                self._load_to_cache,
+                key,
+                loader,
+                model,
+                self._get_ttl(request),
+                entry,
+            ),
+        )
+
+    def _refresh_in_background(
+        self, refresh: Awaitable[list[BaseModel]]
+    ) -> None:
+        task = asyncio.create_task(refresh)
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_done)
+
+    @staticmethod
+    def _set_cache_status(
+        request: Request | None, status: CacheStatus
+    ) -> None:
+        if request is not None:
+            request.state.cache_status = status
+
+    def _get_projection(self, request: Request | None) -> Projection:
+        """Метод получения проекции документов по модели ответа эндпоинта
+        (ее сохраняет в request.state.response_model CachedResponseRoute).
+        """
+        response_model = (
+            getattr(request.state, "response_model", None) if request else None
+        )
+        return get_projection(response_model, self.model)
+
+    def _get_ttl(self, request: Request | None) -> CacheTTL:
+        """Метод получения TTL записей кэша для эндпоинта запроса."""
+        return ttl_policy.ttl(self._get_endpoint(request), self.index)
+
+    @staticmethod
+    def _get_endpoint(request: Request | None) -> str | None:
+        """Метод получения имени эндпоинта запроса."""
+        endpoint = request.scope.get("endpoint") if request else None
+        return getattr(endpoint, "__name__", None)
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            metrics.incr("cache.refresh.failed")
+            logger.error(f"Ошибка обновления кэша: {task.exception()}")
+
+    async def _load_to_cache(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[list[BaseModel]]],
+        model: BaseModel,
+        ttl: CacheTTL,
+        stale: CacheEntry | None = None,
+    ) -> list[BaseModel]:
+        """Метод загрузки списка из хранилища с сохранением в кэш.
+
+        Пересчет записи выполняет один воркер, получивший аренду в Redis.
+        При фоновом обновлении остальные воркеры просто оставляют
+        устаревшее значение, а при промахе недолго ждут свежее значение
+        и, не дождавшись, загружают список сами. Владелец аренды сохраняет
+        запись сразу и снимает аренду, только когда значение уже в Redis,
+        остальные воркеры пишут через фоновую очередь.
+        """
+        token = await self.cache.acquire_lease(key)
+        if token is None:
+            if stale:
+                metrics.incr("cache.lease.stale_served")
+                return stale.instances
+            if entry := await self._wait_for_fresh(key, model):
+                return entry.instances
+            metrics.incr("cache.lease.fallthrough")
+        try:
+            started = time.monotonic()
+            list_instances = await loader()
+            if list_instances:
+                await self._store(
+                    key,
+                    list_instances,
+                    ttl,
+                    delta=time.monotonic() - started,
+                    leased=token is not None,
+                )
+            elif settings.CACHE_NEGATIVE_IN_SECONDS > 0:
+                metrics.incr("cache.negative.stored")
+                await self._store(
+                    key,
+                    [],
+                    settings.negative_cache_ttl(),
+                    leased=token is not None,
+                )
+            return list_instances
+        finally:
+            if token:
+                await self.cache.release_lease(key, token)
+
+    async def _store(
+        self,
+        key: str,
+        instances: list[BaseModel],
+        ttl: CacheTTL,
+        delta: float = 0.0,
+        leased: bool = False,
+    ) -> None:
+        """Метод сохранения записи в кэш. Запись владельца аренды
+        не ставится в очередь: пока она в очереди (или отброшена
+        при переполнении), ждущие воркеры не дождались бы значения
+        и пошли бы в хранилище сами.
+        """
+        if not leased:
+            await cache_writer.put(
+                self.cache, key=key, instances=instances, ttl=ttl, delta=delta
+            )
+            return
+        try:
+            await self.cache.put_instances_to_cache(key, instances, ttl, delta)
+        except Exception as e:
+            metrics.incr("cache.write.failed")
+            logger.error(f"Ошибка записи в кэш: {e}")
+
+    async def _wait_for_fresh(
+        self, key: str, model: BaseModel
+    ) -> CacheEntry | None:
+        """Метод ожидания свежей записи, которую пересчитывает другой воркер."""
+        deadline = time.monotonic() + settings.CACHE_LEASE_WAIT_MS / 1000
+        while time.monotonic() < deadline:
+            await asyncio.sleep(settings.CACHE_LEASE_POLL_MS / 1000)
+            entry = await self.cache.get_entry(key=key, model=model)
+            if entry and entry.is_fresh:
+                metrics.incr("cache.lease.waited")
+                return entry
+        return None
 
     @staticmethod
     def _get_es_query(
@@ -123,7 +576,8 @@ class CommonService:
         es_query = QUERY_BASE % {
             "from_": from_,
             "page_size": page_size,
-            "sort": sort,
+            # с последним уникальным полем порядок документов однозначен
+            "sort": f"{sort}, {SORT_TIEBREAKER}" if sort else SORT_RELEVANCE,
             "bool": bool_stmt,
         }
         return es_query
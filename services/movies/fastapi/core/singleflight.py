@@ -0,0 +1,62 @@
+"""Объединение одновременных запросов (single-flight)."""
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from core.metrics import metrics
+
+
+class _Call:
+    """Выполняющийся вызов и число ожидающих его результата."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Одновременные вызовы с одинаковым ключом ждут одну и ту же задачу.
+
+    Функция выполняется в отдельной задаче, поэтому отмена одного из
+    ожидающих (например, при разрыве соединения клиентом) не отменяет
+    вычисление для остальных. Задача отменяется, только если ее результата
+    не ждет никто. Исключение получают все ожидающие, после чего ключ
+    освобождается и следующий вызов выполнит функцию заново.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: dict[Hashable, _Call] = {}
+
+    async def do(
+        self, key: Hashable, func: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Выполняет func или присоединяется к уже выполняющемуся вызову."""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.create_task(func()))
+            self._calls[key] = call
+            call.task.add_done_callback(
+                lambda task: self._forget(key, call, task)
+            )
+            metrics.incr(f"singleflight.{self.name}.calls")
+        else:
+            metrics.incr(f"singleflight.{self.name}.coalesced")
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call, task: asyncio.Task) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        metrics.set_gauge(
+            f"singleflight.{self.name}.inflight", len(self._calls)
+        )
+        if not task.cancelled():
+            # помечаем исключение полученным, даже если ждать было некому
+            task.exception()
@@ -1,34 +1,100 @@
 from abc import ABC, abstractmethod
 from functools import lru_cache
-from typing import Any
+from typing import Any, AsyncIterator, NamedTuple
 from uuid import UUID
 
-from elasticsearch import AsyncElasticsearch, NotFoundError
+from elasticsearch import AsyncElasticsearch, NotFoundError, RequestError
 from fastapi import Depends
 from pydantic import BaseModel
 
-from core.exceptions import ElasticsearchError
-from core.logger import logger
+from core.codecs import list_adapter
+from core.config import settings
+from core.enum import ErrorMessage
+from core.exceptions import PaginationError
 from db.elastic import get_elastic_instance
 
 
+class SearchPage(NamedTuple):
+    """Страница поиска: документы, общее число найденных, значения
+    сортировки последнего документа и id снимка индекса, по которому
+    выполнен поиск (None - поиск по индексу).
+    """
+
+    instances: list[BaseModel]
+    total: int
+    after: list[Any] | None
+    pit_id: str | None
+
+
 class AbstractStorage(ABC):
     """Абстрактный класс-интерфейс для реализации хранилищ данных"""
 
+    # Во всех методах получения документов fields - пути полей, которые
+    # нужно получить из хранилища (проекция), None - документ целиком
+
     @abstractmethod
     async def get_one_by_id(
-        self, index: str, model_class: BaseModel, uuid: UUID
+        self,
+        index: str,
+        model_class: BaseModel,
+        uuid: UUID,
+        fields: list[str] | None = None,
     ) -> BaseModel | None:
         """Абстрактный метод получения инстанса указанной модели
         по id документа в хранилище
         """
 
     @abstractmethod
-    async def get_list_by_search(
-        self, index: str, model_class: BaseModel, query: str
-    ) -> list[BaseModel] | None:
-        """Абстрактный метод получения списка инстансов указанной модели
-        по заданным параметрам поиска
+    async def get_many_by_ids(
+        self,
+        index: str,
+        model_class: BaseModel,
+        uuids: list[UUID],
+        fields: list[str] | None = None,
+    ) -> list[BaseModel]:
+        """Абстрактный метод получения инстансов указанной модели
+        по списку id документов одним запросом (в порядке id,
+        отсутствующие документы пропускаются)
+        """
+
+    @abstractmethod
+    async def get_page_by_search_after(
+        self,
+        index: str,
+        model_class: BaseModel,
+        query: dict,
+        fields: list[str] | None = None,
+        pit_id: str | None = None,
+    ) -> SearchPage:
+        """Абстрактный метод получения страницы инстансов указанной модели
+        по запросу с сортировкой (и search_after, если страница не первая)
+        в индексе или в снимке индекса pit_id
+        """
+
+    @abstractmethod
+    async def open_pit(self, index: str) -> str:
+        """Абстрактный метод открытия снимка индекса (point in time)"""
+
+    @abstractmethod
+    async def close_pit(self, pit_id: str) -> None:
+        """Абстрактный метод закрытия снимка индекса"""
+
+    @abstractmethod
+    def iter_batches(
+        self, index: str, fields: list[str] | None = None
+    ) -> AsyncIterator[list[dict]]:
+        """Абстрактный метод перебора пачками всех документов индекса
+        (в виде, в котором они хранятся) по снимку индекса
+        """
+
+    @abstractmethod
+    def iter_ids(self, index: str) -> AsyncIterator[str]:
+        """Абстрактный метод перебора id всех документов индекса"""
+
+    @abstractmethod
+    async def get_index_version(self, index: str) -> str | None:
+        """Абстрактный метод получения версии индекса, меняющейся
+        при любой записи в индекс (None, если индекса нет)
         """
 
 
@@ -36,28 +102,179 @@ class ElasticService(AbstractStorage):
     def __init__(self, elastic: AsyncElasticsearch) -> None:
         self.elastic = elastic
 
+    @staticmethod
+    def _validate(model_class: Any | None, documents: list[dict]) -> list[Any]:
+        """Объекты модели из документов одной валидацией списка
+        (None - документы как есть). Сборка без валидации через
+        model_construct медленнее, см. python -m benchmarks.hydration.
+        """
+        if model_class is None:
+            return documents
+        return list_adapter(model_class).validate_python(documents)
+
     async def get_one_by_id(
-        self, index: str, model_class: Any, uuid: UUID
+        self,
+        index: str,
+        model_class: Any,
+        uuid: UUID,
+        fields: list[str] | None = None,
     ) -> BaseModel | None:
         try:
-            doc = await self.elastic.get(index=index, id=str(uuid))
-            return model_class(**doc["_source"])
+            doc = await self.elastic.get(
+                index=index, id=str(uuid), _source_includes=fields
+            )
+            return self._validate(model_class, [doc["_source"]])[0]
         except NotFoundError:
             return None
 
-    async def get_list_by_search(
-        self, index: str, model_class: Any, query: str
-    ) -> list[BaseModel] | None:
+    async def get_many_by_ids(
+        self,
+        index: str,
+        model_class: Any,
+        uuids: list[UUID],
+        fields: list[str] | None = None,
+    ) -> list[BaseModel]:
+        if not uuids:
+            return []
+        result = await self.elastic.mget(
+            index=index,
+            body={"ids": [str(uuid) for uuid in uuids]},
+            _source_includes=fields,
+        )
+        return self._validate(
+            model_class,
+            [doc["_source"] for doc in result["docs"] if doc.get("found")],
+        )
+
+    async def get_page_by_search_after(
+        self,
+        index: str,
+        model_class: Any,
+        query: dict,
+        fields: list[str] | None = None,
+        pit_id: str | None = None,
+    ) -> SearchPage:
+        if pit_id:
+            # поиск по снимку идет без индекса в пути запроса
+            query = {
+                **query,
+                "pit": {
+                    "id": pit_id,
+                    "keep_alive": settings.SEARCH_PIT_KEEP_ALIVE,
+                },
+            }
+            index = None
+        try:
+            search_result = await self.elastic.search(
+                index=index, body=query, _source_includes=fields
+            )
+        except NotFoundError:
+            if pit_id:
+                raise PaginationError(ErrorMessage.expired_cursor)
+            raise
+        except RequestError:
+            # search_after из курсора не подходит к сортировке запроса
+            if "search_after" in query:
+                raise PaginationError(ErrorMessage.invalid_cursor)
+            raise
+        hits = search_result["hits"]["hits"]
+        # без track_total_hits общего числа найденных в ответе нет
+        total = search_result["hits"].get("total", 0)
+        if isinstance(total, dict):
+            total = total["value"]
+        return SearchPage(
+            instances=self._validate(
+                model_class, [doc["_source"] for doc in hits]
+            ),
+            total=total,
+            after=hits[-1].get("sort") if hits else None,
+            pit_id=search_result.get("pit_id"),
+        )
+
+    async def open_pit(self, index: str) -> str:
+        # в клиенте 7.9 нет open_point_in_time
+        result = await self.elastic.transport.perform_request(
+            "POST",
+            f"/{index}/_pit",
+            params={"keep_alive": settings.SEARCH_PIT_KEEP_ALIVE},
+        )
+        return result["id"]
+
+    async def close_pit(self, pit_id: str) -> None:
         try:
-            search_result = await self.elastic.search(index=index, body=query)
-            list_instances = [
-                model_class(**doc["_source"])
-                for doc in search_result["hits"]["hits"]
-            ]
-            return list_instances
-        except ElasticsearchError as e:
-            logger.error(f"Ошибка Elasticsearch: {e}")
+            await self.elastic.transport.perform_request(
+                "DELETE", "/_pit", body={"id": pit_id}
+            )
+        except NotFoundError:
+            pass
+
+    async def iter_batches(
+        self, index: str, fields: list[str] | None = None
+    ) -> AsyncIterator[list[dict]]:
+        pit_id = await self.open_pit(index)
+        query = {
+            "size": settings.EXPORT_BATCH_SIZE,
+            "sort": [{"uuid": {"order": "asc"}}],
+            "track_total_hits": False,
+        }
+        try:
+            while True:
+                # документы отдаются как хранятся, без сборки в модели
+                page = await self.get_page_by_search_after(
+                    index=index,
+                    model_class=None,
+                    query=query,
+                    fields=fields,
+                    pit_id=pit_id,
+                )
+                pit_id = page.pit_id or pit_id
+                if page.instances:
+                    yield page.instances
+                if len(page.instances) < query["size"]:
+                    break
+                query["search_after"] = page.after
+        finally:
+            # при обрыве выгрузки снимок истечет сам через keep_alive
+            await self.close_pit(pit_id)
+
+    async def iter_ids(
+        self, index: str, batch_size: int = 5000
+    ) -> AsyncIterator[str]:
+        result = await self.elastic.search(
+            index=index,
+            body={"_source": False, "sort": ["_doc"]},
+            scroll="1m",
+            size=batch_size,
+        )
+        scroll_id = result.get("_scroll_id")
+        try:
+            while hits := result["hits"]["hits"]:
+                for doc in hits:
+                    yield doc["_id"]
+                result = await self.elastic.scroll(
+                    scroll_id=scroll_id, scroll="1m"
+                )
+                scroll_id = result.get("_scroll_id")
+        finally:
+            if scroll_id:
+                await self.elastic.clear_scroll(scroll_id=scroll_id)
+
+    async def get_index_version(self, index: str) -> str | None:
+        try:
+            stats = await self.elastic.indices.stats(
+                index=index, metric="docs,indexing"
+            )
+        except NotFoundError:
             return None
+        primaries = stats["_all"]["primaries"]
+        return ":".join(
+            str(value)
+            for value in (
+                primaries["docs"]["count"],
+                primaries["indexing"]["index_total"],
+                primaries["indexing"]["delete_total"],
+            )
+        )
 
 
 @lru_cache()
@@ -0,0 +1,214 @@
+"""Политика TTL записей кэша.
+
+TTL берется из таблицы настроек: по имени эндпоинта
+(CACHE_TTL_BY_ENDPOINT), затем по индексу (CACHE_TTL_BY_INDEX), затем
+общий. Класс ключей - эндпоинт, а для записей документов, сохраняемых
+вне эндпоинта (при сборке страниц), - индекс.
+
+С CACHE_TTL_ADAPTIVE мягкий TTL класса раз в
+CACHE_TTL_ADAPTIVE_INTERVAL_IN_SECONDS подстраивается по итогам
+интервала: если индекс класса менялся, TTL уменьшается вдвое, если
+изменений не было, а попаданий набралось не меньше
+CACHE_TTL_ADAPTIVE_MIN_HITS, - удваивается, иначе возвращается к TTL
+из таблицы. TTL остается в пределах CACHE_TTL_ADAPTIVE_MIN_FACTOR и
+CACHE_TTL_ADAPTIVE_MAX_FACTOR от TTL из таблицы, время хранения
+устаревшей записи (разница жесткого и мягкого TTL) не меняется.
+
+Попадания каждый воркер считает сам, а изменения индексов (вызовы
+инвалидации) считаются в Redis, чтобы их видели все воркеры.
+"""
+import asyncio
+
+from core.config import CacheTTL, settings
+from core.logger import logger
+from core.metrics import metrics
+from redis.asyncio import Redis
+
+CHANGES_KEY = f"{settings.CACHE_KEY_PREFIX}:ttl:changes"
+
+
+class KeyClass:
+    """Класс ключей кэша: TTL из таблицы, текущий мягкий TTL и счетчики
+    текущего и прошлого интервалов.
+    """
+
+    __slots__ = (
+        "name",
+        "source",
+        "index",
+        "base",
+        "soft",
+        "hits",
+        "misses",
+        "last_hits",
+        "last_misses",
+        "last_changes",
+    )
+
+    def __init__(
+        self, name: str, source: str, index: str | None, base: CacheTTL
+    ) -> None:
+        self.name = name
+        self.source = source
+        self.index = index
+        self.base = base
+        self.soft = base.soft
+        self.hits = 0
+        self.misses = 0
+        self.last_hits = 0
+        self.last_misses = 0
+        self.last_changes = 0
+
+    @property
+    def ttl(self) -> CacheTTL:
+        return CacheTTL(
+            soft=self.soft, hard=self.soft + self.base.hard - self.base.soft
+        )
+
+    def adapt(self, changes: int) -> None:
+        """Подстраивает мягкий TTL по итогам интервала."""
+        if changes:
+            soft = self.soft // 2
+        elif self.hits >= settings.CACHE_TTL_ADAPTIVE_MIN_HITS:
+            soft = self.soft * 2
+        else:
+            soft = self.base.soft
+        self.soft = int(
+            min(
+                max(
+                    soft,
+                    self.base.soft * settings.CACHE_TTL_ADAPTIVE_MIN_FACTOR,
+                ),
+                self.base.soft * settings.CACHE_TTL_ADAPTIVE_MAX_FACTOR,
+            )
+        )
+        self.last_hits, self.last_misses = self.hits, self.misses
+        self.last_changes = changes
+        self.hits = self.misses = 0
+
+
+class TTLPolicy:
+    """TTL классов ключей с периодической подстройкой."""
+
+    def __init__(self) -> None:
+        self._classes: dict[str, KeyClass] = {}
+        self._changes_seen: dict[str, int] | None = None
+        self._redis: Redis | None = None
+        self._task: asyncio.Task | None = None
+        # классы из таблицы настроек известны сразу, остальные появляются
+        # при первом обращении
+        for endpoint in settings.CACHE_TTL_BY_ENDPOINT:
+            self._get_class(endpoint, None)
+        for index in settings.CACHE_TTL_BY_INDEX:
+            self._get_class(None, index)
+
+    def ttl(self, endpoint: str | None, index: str | None) -> CacheTTL:
+        """TTL записей эндпоинта (или документов индекса)."""
+        return self._effective(self._get_class(endpoint, index))
+
+    def record(
+        self,
+        endpoint: str | None,
+        index: str | None,
+        hits: int = 0,
+        misses: int = 0,
+    ) -> None:
+        """Учитывает попадания и промахи класса ключей."""
+        key_class = self._get_class(endpoint, index)
+        key_class.hits += hits
+        key_class.misses += misses
+
+    async def record_change(self, index: str) -> None:
+        """Учитывает изменение документов индекса для всех воркеров."""
+        if self._redis is not None:
+            await self._redis.hincrby(CHANGES_KEY, str(index), 1)
+
+    def describe(self) -> list[dict]:
+        """Действующая политика по классам ключей из таблицы настроек
+        и классам, которые уже обслуживал воркер.
+        """
+        return [
+            {
+                "key_class": key_class.name,
+                "source": key_class.source,
+                "index": key_class.index,
+                "base": key_class.base,
+                "effective": self._effective(key_class),
+                "hits": key_class.hits,
+                "misses": key_class.misses,
+                "last_hits": key_class.last_hits,
+                "last_misses": key_class.last_misses,
+                "last_changes": key_class.last_changes,
+            }
+            for key_class in self._classes.values()
+        ]
+
+    async def start(self, redis: Redis) -> None:
+        """Запускает подстройку TTL (если она включена)."""
+        if not settings.CACHE_TTL_ADAPTIVE or self._task is not None:
+            return
+        self._redis = redis
+        self._changes_seen = await self._read_changes()
+        self._task = asyncio.create_task(self._adapt_loop())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._redis = None
+
+    async def adapt(self) -> None:
+        """Подстраивает TTL всех классов по итогам интервала."""
+        changes = await self._read_changes()
+        for key_class in self._classes.values():
+            index = key_class.index
+            key_class.adapt(
+                changes.get(index, 0) - self._changes_seen.get(index, 0)
+            )
+            metrics.set_gauge(f"cache.ttl.{key_class.name}", key_class.soft)
+        self._changes_seen = changes
+
+    @staticmethod
+    def _effective(key_class: KeyClass) -> CacheTTL:
+        if not settings.CACHE_TTL_ADAPTIVE:
+            return key_class.base
+        return key_class.ttl
+
+    def _get_class(self, endpoint: str | None, index: str | None) -> KeyClass:
+        index = str(index) if index is not None else None
+        name = endpoint or index or "default"
+        if key_class := self._classes.get(name):
+            if key_class.index is None:
+                # индекс эндпоинта из таблицы известен с первого обращения
+                key_class.index = index
+            return key_class
+        # откуда взят TTL из таблицы
+        if endpoint in settings.CACHE_TTL_BY_ENDPOINT:
+            source = "endpoint"
+        elif index in settings.CACHE_TTL_BY_INDEX:
+            source = "index"
+        else:
+            source = "default"
+        key_class = KeyClass(
+            name, source, index, settings.cache_ttl(endpoint, index)
+        )
+        self._classes[name] = key_class
+        return key_class
+
+    async def _read_changes(self) -> dict[str, int]:
+        values = await self._redis.hgetall(CHANGES_KEY)
+        return {key.decode(): int(value) for key, value in values.items()}
+
+    async def _adapt_loop(self) -> None:
+        while True:
+            await asyncio.sleep(
+                settings.CACHE_TTL_ADAPTIVE_INTERVAL_IN_SECONDS
+            )
+            try:
+                await self.adapt()
+            except Exception as e:
+                logger.error(f"Ошибка подстройки TTL: {e}")
+
+
+ttl_policy = TTLPolicy()
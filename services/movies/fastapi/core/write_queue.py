@@ -0,0 +1,170 @@
+"""Фоновая запись в кэш.
+
+Запись в кэш не нужна для ответа клиенту, поэтому при промахе значение
+ставится в ограниченную очередь воркера, а фоновая задача сохраняет
+накопившиеся записи пакетами: записи с одинаковым TTL уходят в Redis
+одним pipeline. Исключение - запись владельца аренды на пересчет: ее
+ждут другие воркеры, поэтому она сохраняется сразу
+(см. CommonService._store). При завершении приложения очередь дописывается.
+"""
+import asyncio
+
+from core.cache import AbstractCacheService
+from core.config import CacheTTL, settings
+from core.logger import logger
+from core.metrics import metrics
+from pydantic import BaseModel
+
+
+class _Write:
+    """Записи одного обращения к кэшу, ожидающие сохранения."""
+
+    __slots__ = ("cache", "items", "ttl", "deltas")
+
+    def __init__(
+        self,
+        cache: AbstractCacheService,
+        items: dict[str, list[BaseModel]],
+        ttl: CacheTTL,
+        deltas: dict[str, float] | None,
+    ) -> None:
+        self.cache = cache
+        self.items = items
+        self.ttl = ttl
+        self.deltas = deltas or {}
+
+
+class CacheWriteQueue:
+    """Очередь записи в кэш с пакетным сохранением.
+
+    Если очередь заполнена, запись обрабатывается по
+    CACHE_WRITE_DROP_POLICY: drop_new - новая запись отбрасывается,
+    drop_oldest - отбрасывается самая старая из очереди, write_through -
+    новая запись сохраняется сразу, в обработчике запроса. Пока фоновая
+    задача не запущена (или CACHE_WRITE_QUEUE_SIZE = 0), записи
+    сохраняются сразу.
+    """
+
+    def __init__(self) -> None:
+        self._queue: asyncio.Queue[_Write] | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if settings.CACHE_WRITE_QUEUE_SIZE <= 0 or self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=settings.CACHE_WRITE_QUEUE_SIZE)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Дописывает очередь (не дольше CACHE_WRITE_FLUSH_TIMEOUT_MS)
+        и останавливает фоновую задачу.
+        """
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(
+                self._queue.join(),
+                timeout=settings.CACHE_WRITE_FLUSH_TIMEOUT_MS / 1000,
+            )
+        except asyncio.TimeoutError:
+            metrics.incr("cache.write.dropped", self._queue.qsize())
+            logger.error(
+                f"Не дописано в кэш при остановке: {self._queue.qsize()}"
+            )
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def put(
+        self,
+        cache: AbstractCacheService,
+        key: str,
+        instances: list[BaseModel],
+        ttl: CacheTTL,
+        delta: float = 0.0,
+    ) -> None:
+        """Ставит в очередь сохранение списка объектов по ключу."""
+        await self.put_many(cache, {key: instances}, ttl, {key: delta})
+
+    async def put_many(
+        self,
+        cache: AbstractCacheService,
+        items: dict[str, list[BaseModel]],
+        ttl: CacheTTL,
+        deltas: dict[str, float] | None = None,
+    ) -> None:
+        """Ставит в очередь пакетное сохранение записей."""
+        if not items:
+            return
+        write = _Write(cache, items, ttl, deltas)
+        if not self.running:
+            await self._write([write])
+            return
+        if self._queue.full():
+            policy = settings.CACHE_WRITE_DROP_POLICY
+            if policy == "write_through":
+                metrics.incr("cache.write.through")
+                await self._write([write])
+                return
+            metrics.incr("cache.write.dropped")
+            if policy == "drop_new":
+                return
+            self._queue.get_nowait()
+            self._queue.task_done()
+        self._queue.put_nowait(write)
+        metrics.incr("cache.write.queued")
+        metrics.set_gauge("cache.write.queue_size", self._queue.qsize())
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while (
+                len(batch) < settings.CACHE_WRITE_BATCH_SIZE
+                and not self._queue.empty()
+            ):
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._write(batch)
+            except Exception as e:
+                metrics.incr("cache.write.failed", len(batch))
+                logger.error(f"Ошибка записи в кэш: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+                metrics.set_gauge(
+                    "cache.write.queue_size", self._queue.qsize()
+                )
+
+    @staticmethod
+    async def _write(batch: list[_Write]) -> None:
+        """Сохраняет записи пакета: одно обращение к кэшу на каждую пару
+        (кэш, TTL), повторные ключи сохраняются один раз, последними.
+        """
+        groups: dict[tuple, _Write] = {}
+        for write in batch:
+            group_key = (id(write.cache), write.ttl.soft, write.ttl.hard)
+            group = groups.setdefault(
+                group_key, _Write(write.cache, {}, write.ttl, {})
+            )
+            group.items.update(write.items)
+            group.deltas.update(write.deltas)
+        await asyncio.gather(
+            *(
+                group.cache.put_many_to_cache(
+                    group.items, group.ttl, group.deltas
+                )
+                for group in groups.values()
+            )
+        )
+        metrics.incr("cache.write.batches")
+        metrics.incr(
+            "cache.write.written",
+            sum(len(group.items) for group in groups.values()),
+        )
+
+
+cache_writer = CacheWriteQueue()
@@ -1,12 +1,22 @@
 from contextlib import asynccontextmanager
+from http import HTTPStatus
 
 import sentry_sdk
+from api.internal import cache, edge
 from api.v1 import films, genres, persons
+from core.bloom import uuid_filters
 from core.config import settings
+from core.enum import IndexName
+from core.exceptions import BadRequestError
+from core.invalidation import invalidation_listener
 from core.logger import logger
+from core.middleware import CacheStatusMiddleware
+from core.storage import ElasticService
+from core.ttl_policy import ttl_policy
+from core.write_queue import cache_writer
 from db import elastic, redis
 from elasticsearch import AsyncElasticsearch
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.responses import ORJSONResponse
 from redis.asyncio import Redis
 from sentry_sdk.integrations.fastapi import FastApiIntegration
@@ -21,9 +31,19 @@ async def lifespan(app: FastAPI):
     elastic.es = AsyncElasticsearch(
         hosts=[f"{settings.ELASTIC_HOST}:{settings.ELASTIC_PORT}"]
     )
+    if settings.CACHE_BLOOM_ENABLED:
+        await uuid_filters.start(ElasticService(elastic.es), list(IndexName))
+    await invalidation_listener.start()
+    await ttl_policy.start(redis.redis)
+    cache_writer.start()
     logger.info("App started")
     yield
     # Логика при завершении приложения.
+    # отложенные записи в кэш дописываются, пока Redis еще доступен
+    await cache_writer.stop()
+    await ttl_policy.stop()
+    await invalidation_listener.stop()
+    await uuid_filters.stop()
     await redis.redis.close()
     await elastic.es.close()
     logger.info("App exited")
@@ -40,9 +60,26 @@ app = FastAPI(
     openapi_url=settings.OPENAPI_URL,
     default_response_class=ORJSONResponse,
 )
+app.add_middleware(CacheStatusMiddleware)
+
+
+@app.exception_handler(BadRequestError)
+async def bad_request_error_handler(
+    request: Request, exc: BadRequestError
+) -> ORJSONResponse:
+    return ORJSONResponse(
+        status_code=HTTPStatus.BAD_REQUEST, content={"detail": str(exc)}
+    )
+
 
 app.include_router(
     films.router, prefix="/api/v1/films", tags=["Кинопроизведения"]
 )
 app.include_router(persons.router, prefix="/api/v1/persons", tags=["Персоны"])
 app.include_router(genres.router, prefix="/api/v1/genres", tags=["Жанры"])
+app.include_router(
+    cache.router, prefix="/api/internal/cache", tags=["Служебное: кэш"]
+)
+app.include_router(
+    edge.router, prefix="/api/internal/edge", tags=["Служебное: прокси"]
+)
@@ -0,0 +1,13 @@
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from core.config import settings
+
+
+class UUIDBatch(BaseModel):
+    uuids: list[UUID] = Field(
+        min_length=1,
+        max_length=settings.BATCH_MAX_UUIDS,
+        description="UUID документов, порядок сохраняется в ответе",
+    )
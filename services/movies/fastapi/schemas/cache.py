@@ -0,0 +1,38 @@
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from core.config import CacheTTL
+from core.enum import IndexName
+
+
+class CacheInvalidation(BaseModel):
+    index: IndexName
+    uuids: list[UUID] | None = Field(
+        default=None,
+        description="UUID измененных документов, без них - весь индекс",
+    )
+
+
+class CacheInvalidationResult(BaseModel):
+    deleted: int
+    purged: dict[str, bool] = Field(
+        default={}, description="Успех purge по адресатам EDGE_PURGE_URLS"
+    )
+
+
+class CacheTTLClass(BaseModel):
+    key_class: str = Field(description="Эндпоинт или индекс")
+    source: str = Field(
+        description="Откуда взят TTL из таблицы: endpoint, index, default"
+    )
+    index: str | None
+    base: CacheTTL = Field(description="TTL из таблицы настроек")
+    effective: CacheTTL = Field(description="Действующий TTL")
+    hits: int
+    misses: int
+    last_hits: int = Field(description="Попадания прошлого интервала")
+    last_misses: int
+    last_changes: int = Field(
+        description="Изменения индекса за прошлый интервал"
+    )
@@ -0,0 +1,27 @@
+from uuid import UUID
+
+from pydantic import BaseModel, Field, model_validator
+
+from core.enum import IndexName
+
+
+class EdgePurge(BaseModel):
+    indexes: list[IndexName] = Field(
+        default=[], description="Индексы, все ответы по которым удаляются"
+    )
+    uuids: list[UUID] = Field(
+        default=[], description="UUID документов, ответы с которыми удаляются"
+    )
+
+    @model_validator(mode="after")
+    def check_not_empty(self) -> "EdgePurge":
+        if not self.indexes and not self.uuids:
+            raise ValueError("Нужно указать indexes или uuids")
+        return self
+
+
+class EdgePurgeResult(BaseModel):
+    keys: list[str]
+    purged: dict[str, bool] = Field(
+        description="Успех purge по каждому адресату из EDGE_PURGE_URLS"
+    )
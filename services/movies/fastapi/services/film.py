@@ -1,7 +1,11 @@
 from functools import lru_cache
 from pprint import pprint
 
-from core.cache import AbstractCacheService, get_cache_service
+from core.cache import (
+    AbstractCacheService,
+    build_cache_key,
+    get_cache_service,
+)
 from core.config import settings
 from core.enum import IndexName
 from core.service import CommonService
@@ -52,10 +56,15 @@ class FilmService(CommonService):
         """
         print("\n")
         pprint(search_query)
-        if list_instances := await self.cache.get_instances_from_cache(
-            request=request, model=self.model
-        ):
-            return list_instances
+        key = build_cache_key(
+            self.index,
+            "advanced_search",
+            page_number=page_number,
+            page_size=page_size,
+            sort=sort,
+            search_query=search_query,
+            bool_operator=bool_operator,
+        )
         if sort:
             sort = self._get_sort(sort=sort)
         matches = search_query.get("movie", {})
@@ -85,14 +94,7 @@ class FilmService(CommonService):
             nested_matches=nested_matches,
             bool_operator=bool_operator,
         )
-        list_instances = await self.elastic.get_list_by_search(
-            index=self.index, model_class=self.model, query=es_query
-        )
-        if list_instances and request:
-            await self.cache.put_instances_to_cache(
-                request=request, instances=list_instances
-            )
-        return list_instances
+        return await self._get_page(key, es_query, request)
 
 
 @lru_cache()
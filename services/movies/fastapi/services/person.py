@@ -1,7 +1,11 @@
 from functools import lru_cache
 from pprint import pprint
 
-from core.cache import AbstractCacheService, get_cache_service
+from core.cache import (
+    AbstractCacheService,
+    build_cache_key,
+    get_cache_service,
+)
 from core.config import settings
 from core.enum import IndexName
 from core.service import CommonService
@@ -53,12 +57,20 @@ class PersonService(CommonService):
         """
         print("\n")
         pprint(search_query)
+        key = build_cache_key(
+            self.index,
+            "advanced_search",
+            page_number=page_number,
+            page_size=page_size,
+            search_query=search_query,
+            bool_operator=bool_operator,
+        )
         matches = search_query.get("person", {})
         nested_matches = {}
         films: list[dict] = search_query.get("films", [])
         for film in films:
-            for key, value in film.items():
-                nested_matches["films." + key] = value
+            for field, value in film.items():
+                nested_matches["films." + field] = value
 
         es_query = self._get_es_query(
             page_number=page_number,
@@ -67,14 +79,7 @@ class PersonService(CommonService):
             nested_matches=nested_matches,
             bool_operator=bool_operator,
         )
-        list_instances = await self.elastic.get_list_by_search(
-            index=self.index, model_class=self.model, query=es_query
-        )
-        if list_instances and request:
-            await self.cache.put_instances_to_cache(
-                request=request, instances=list_instances
-            )
-        return list_instances
+        return await self._get_page(key, es_query, request)
 
 
 @lru_cache()
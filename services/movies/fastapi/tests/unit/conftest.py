@@ -0,0 +1,51 @@
+"""Общие фикстуры модульных тестов."""
+import time
+from uuid import UUID
+
+import pytest
+from core.cache import RedisService
+from core.codecs import get_codec
+from fakeredis.aioredis import FakeRedis
+from pydantic import BaseModel
+
+
+class Clock:
+    """Подменяемое время для time.monotonic."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Замораживает time.monotonic, время сдвигается через advance()."""
+    fake = Clock()
+    monkeypatch.setattr(time, "monotonic", fake)
+    return fake
+
+
+class Item(BaseModel):
+    """Модель документа для тестов кэша."""
+
+    uuid: UUID
+    title: str
+
+
+@pytest.fixture
+async def redis():
+    """Redis в памяти процесса (со скриптами Lua)."""
+    client = FakeRedis()
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+def redis_cache(redis):
+    """Кэш второго уровня поверх fakeredis."""
+    return RedisService(redis, codec=get_codec("json"))
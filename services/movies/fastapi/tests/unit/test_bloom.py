@@ -0,0 +1,73 @@
+"""Тесты фильтров Блума UUID документов."""
+from uuid import uuid4
+
+from core.bloom import BloomFilter, UUIDFilters
+from core.config import settings
+from core.enum import IndexName
+
+
+def test_no_false_negatives():
+    """Добавленные элементы всегда находятся в фильтре."""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01, max_bytes=1024**2)
+    uuids = [uuid4() for _ in range(1000)]
+    for uuid in uuids:
+        bloom.add(uuid)
+    assert all(uuid in bloom for uuid in uuids)
+    assert bloom.count == 1000
+
+
+def test_false_positive_rate():
+    """Доля ложных срабатываний близка к заданной."""
+    bloom = BloomFilter(capacity=5000, error_rate=0.01, max_bytes=1024**2)
+    for _ in range(5000):
+        bloom.add(uuid4())
+    checks = 20000
+    false_positives = sum(uuid4() in bloom for _ in range(checks))
+    assert false_positives / checks < 0.02
+    assert bloom.error_rate < 0.02
+
+
+def test_memory_cap():
+    """Размер фильтра не превышает max_bytes, ценой точности."""
+    bloom = BloomFilter(capacity=100000, error_rate=0.001, max_bytes=1024)
+    assert bloom.size_bytes == 1024
+    for _ in range(10000):
+        bloom.add(uuid4())
+    assert bloom.size_bytes == 1024
+    assert bloom.error_rate > 0.001
+
+
+def test_might_contain_without_filter():
+    """Пока фильтр индекса не построен, любой UUID возможно есть."""
+    filters = UUIDFilters()
+    assert filters.might_contain(IndexName.movies, uuid4())
+
+
+class FakeStorage:
+    """Хранилище с фиксированным набором UUID индекса."""
+
+    def __init__(self, uuids):
+        self.uuids = uuids
+
+    async def get_index_version(self, index):
+        return "1"
+
+    async def iter_ids(self, index):
+        for uuid in self.uuids:
+            yield uuid
+
+
+async def test_might_contain_with_filter(monkeypatch):
+    """Построенный фильтр отсекает неизвестные UUID, а add добавляет
+    новые документы без перестройки.
+    """
+    monkeypatch.setattr(settings, "CACHE_BLOOM_ERROR_RATE", 1e-9)
+    known, new = uuid4(), uuid4()
+    filters = UUIDFilters()
+    storage = FakeStorage([known, *(uuid4() for _ in range(99))])
+    await filters.refresh(storage, [IndexName.movies])
+    assert filters.might_contain(IndexName.movies, known)
+    assert not filters.might_contain(IndexName.movies, new)
+    assert filters.might_contain(IndexName.persons, new)
+    filters.add(IndexName.movies, [new])
+    assert filters.might_contain(IndexName.movies, new)
@@ -0,0 +1,86 @@
+"""Тесты кодеков и сжатия значений кэша."""
+from uuid import uuid4
+
+import pytest
+from conftest import Item
+from core.cache import RedisService
+from core.codecs import CODECS, get_codec
+from core.compression import COMPRESSORS, MARKERS, get_compressor
+from core.config import CacheTTL, settings
+
+KEY = "movies:test:key"
+TTL = CacheTTL(soft=60, hard=120)
+
+
+def make_items(count: int) -> list[Item]:
+    return [
+        Item(uuid=uuid4(), title=f"Film {number}") for number in range(count)
+    ]
+
+
+def available_compressor(name: str):
+    try:
+        return get_compressor(name)
+    except RuntimeError as e:
+        pytest.skip(str(e))
+
+
+@pytest.mark.parametrize("compression", ["none", *COMPRESSORS])
+@pytest.mark.parametrize("codec", list(CODECS))
+async def test_round_trip(redis, monkeypatch, codec, compression):
+    """Список объектов читается из Redis таким же, каким был записан."""
+    monkeypatch.setattr(settings, "CACHE_COMPRESSION_MIN_BYTES", 0)
+    try:
+        cache_codec = get_codec(codec)
+    except RuntimeError as e:
+        pytest.skip(str(e))
+    cache = RedisService(
+        redis,
+        codec=cache_codec,
+        compressor=available_compressor(compression),
+    )
+    items = make_items(50)
+    await cache.put_instances_to_cache(KEY, items, TTL)
+    raw = await redis.get(cache.key_prefix + KEY)
+    assert (raw[0] in MARKERS) == (compression != "none")
+    assert (await cache.get_entry(KEY, Item)).instances == items
+    assert (await cache.get_entry(KEY, Item)).is_fresh
+
+
+async def test_small_values_stay_plain(redis, monkeypatch):
+    """Значения меньше CACHE_COMPRESSION_MIN_BYTES хранятся без маркера."""
+    monkeypatch.setattr(settings, "CACHE_COMPRESSION_MIN_BYTES", 1024)
+    cache = RedisService(
+        redis, codec=get_codec("json"), compressor=get_compressor("zlib")
+    )
+    items = make_items(1)
+    await cache.put_instances_to_cache(KEY, items, TTL)
+    raw = await redis.get(cache.key_prefix + KEY)
+    assert raw[0] not in MARKERS
+    assert (await cache.get_entry(KEY, Item)).instances == items
+
+
+@pytest.mark.parametrize("compression", list(COMPRESSORS))
+async def test_reads_values_of_other_settings(redis, monkeypatch, compression):
+    """Несжатые (старые) значения читаются при включенном сжатии,
+    а сжатые - при любом алгоритме или без него: алгоритм определяется
+    по маркеру значения.
+    """
+    monkeypatch.setattr(settings, "CACHE_COMPRESSION_MIN_BYTES", 0)
+    plain = RedisService(redis, codec=get_codec("json"))
+    compressed = RedisService(
+        redis,
+        codec=get_codec("json"),
+        compressor=available_compressor(compression),
+    )
+    items = make_items(50)
+    await plain.put_instances_to_cache(KEY, items, TTL)
+    assert (await compressed.get_entry(KEY, Item)).instances == items
+
+    await compressed.put_instances_to_cache(KEY, items, TTL)
+    assert (await plain.get_entry(KEY, Item)).instances == items
+    other = "lz4" if compression == "zlib" else "zlib"
+    reader = RedisService(
+        redis, codec=get_codec("json"), compressor=available_compressor(other)
+    )
+    assert (await reader.get_entry(KEY, Item)).instances == items
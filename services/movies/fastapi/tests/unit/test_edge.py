@@ -0,0 +1,38 @@
+"""Тесты заголовков для кэширующего прокси."""
+from uuid import uuid4
+
+from core.config import settings
+from core.edge import surrogate_headers
+
+
+def test_no_headers_without_purge_targets(monkeypatch):
+    """Без адресов purge заголовки Surrogate-* не отправляются."""
+    monkeypatch.setattr(settings, "EDGE_PURGE_URLS", [])
+    assert surrogate_headers(["index:movies"], 60) == {}
+
+
+def test_headers_with_purge_targets(monkeypatch):
+    """Теги передаются через пробел, время хранения - в max-age."""
+    monkeypatch.setattr(settings, "EDGE_PURGE_URLS", ["local"])
+    headers = surrogate_headers(["list:movies", "index:movies"], 60)
+    assert headers == {
+        "Surrogate-Key": "index:movies list:movies",
+        "Surrogate-Control": "max-age=60",
+    }
+
+
+def test_doc_tags_dropped_over_budget(monkeypatch):
+    """Длинный список тегов документов заменяется тегами индекса:
+    страница списка 1000 документов не упирается в буфер nginx.
+    """
+    monkeypatch.setattr(settings, "EDGE_PURGE_URLS", ["local"])
+    tags = [
+        "index:movies",
+        "list:movies",
+        *(f"doc:{uuid4()}" for _ in range(1000)),
+    ]
+    headers = surrogate_headers(tags, 60)
+    assert headers["Surrogate-Key"] == "index:movies list:movies"
+    assert len(headers["Surrogate-Key"]) <= (
+        settings.EDGE_SURROGATE_KEY_MAX_BYTES
+    )
@@ -0,0 +1,84 @@
+"""Тесты удаления записей L1 при изменении ключей в Redis."""
+import asyncio
+from uuid import uuid4
+
+import core.invalidation
+from conftest import Item
+from core.cache import RedisService, TwoTierCacheService
+from core.codecs import get_codec
+from core.config import CacheTTL, settings
+from core.invalidation import InvalidationListener
+from core.local_cache import LocalLRUCache
+from fakeredis import FakeServer
+from fakeredis.aioredis import FakeRedis
+
+KEY = "movies:test:key"
+TTL = CacheTTL(soft=60, hard=120)
+
+
+def make_local() -> LocalLRUCache:
+    return LocalLRUCache(max_entries=100, max_bytes=1024**2, ttl=60)
+
+
+async def test_on_invalidate_drops_keys(redis_cache):
+    """Из L1 удаляются только ключи этого кэша, None сбрасывает все."""
+    cache = TwoTierCacheService(local=make_local(), remote=redis_cache)
+    items = [Item(uuid=uuid4(), title="film")]
+    await cache.put_instances_to_cache(KEY, items, TTL)
+    await cache.put_instances_to_cache("movies:test:other", items, TTL)
+    assert cache.local.get(KEY) is not None
+
+    cache.on_invalidate([b"other-prefix:" + KEY.encode()])
+    assert cache.local.get(KEY) is not None
+    cache.on_invalidate([(redis_cache.key_prefix + KEY).encode()])
+    assert cache.local.get(KEY) is None
+    assert len(cache.local) == 1
+    cache.on_invalidate(None)
+    assert len(cache.local) == 0
+
+
+async def wait_for(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "условие не выполнилось"
+        await asyncio.sleep(0.01)
+
+
+async def test_pubsub_drops_l1_of_other_worker(monkeypatch):
+    """Запись одного воркера удаляет устаревшую запись из L1 другого."""
+    monkeypatch.setattr(settings, "CACHE_L1_INVALIDATION", "pubsub")
+    server = FakeServer()
+    monkeypatch.setattr(
+        core.invalidation, "Redis", lambda **kwargs: FakeRedis(server=server)
+    )
+
+    workers = []
+    for _ in range(2):
+        listener = InvalidationListener()
+        cache = TwoTierCacheService(
+            local=make_local(),
+            remote=RedisService(
+                FakeRedis(server=server), codec=get_codec("json")
+            ),
+            listener=listener,
+        )
+        await listener.start()
+        workers.append(cache)
+    first, second = workers
+    try:
+        await wait_for(lambda: all(w.listener.connected for w in workers))
+        old = [Item(uuid=uuid4(), title="old")]
+        new = [Item(uuid=uuid4(), title="new")]
+        await first.put_instances_to_cache(KEY, old, TTL)
+        # сообщение о первой записи тоже должно дойти до второго воркера
+        await asyncio.sleep(0.1)
+        assert (await second.get_entry(KEY, Item)).instances == old
+        assert second.local.get(KEY) is not None
+
+        await first.put_instances_to_cache(KEY, new, TTL)
+        await wait_for(lambda: second.local.get(KEY) is None)
+        assert (await second.get_entry(KEY, Item)).instances == new
+    finally:
+        for worker in workers:
+            await worker.listener.stop()
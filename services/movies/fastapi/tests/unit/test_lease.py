@@ -0,0 +1,145 @@
+"""Тесты аренды на пересчет записей кэша."""
+import asyncio
+from uuid import uuid4
+
+import core.service
+from conftest import Item
+from core.cache import CacheEntry
+from core.config import CacheTTL, settings
+from core.service import CommonService
+
+KEY = "movies:test:key"
+TTL = CacheTTL(soft=60, hard=120)
+
+
+async def test_acquire_and_release(redis_cache):
+    """Аренду получает один владелец, чужой токен ее не снимает."""
+    token = await redis_cache.acquire_lease(KEY)
+    assert token
+    assert await redis_cache.acquire_lease(KEY) is None
+    await redis_cache.release_lease(KEY, "other")
+    assert await redis_cache.acquire_lease(KEY) is None
+    await redis_cache.release_lease(KEY, token)
+    assert await redis_cache.acquire_lease(KEY)
+
+
+async def test_lease_expires(redis_cache, monkeypatch):
+    """Аренда упавшего воркера истекает через CACHE_LEASE_TTL_MS."""
+    monkeypatch.setattr(settings, "CACHE_LEASE_TTL_MS", 50)
+    assert await redis_cache.acquire_lease(KEY)
+    await asyncio.sleep(0.1)
+    assert await redis_cache.acquire_lease(KEY)
+
+
+def make_service(cache):
+    return CommonService(cache=cache, elastic=None, model=Item, index="movies")
+
+
+def make_loader(instances):
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return instances
+
+    return loader, calls
+
+
+async def test_load_releases_lease(redis_cache):
+    """Получивший аренду загружает значение, сохраняет и снимает аренду."""
+    fresh = [Item(uuid=uuid4(), title="fresh")]
+    loader, calls = make_loader(fresh)
+    result = await make_service(redis_cache)._load_to_cache(
+        KEY, loader, Item, TTL
+    )
+    assert result == fresh
+    assert calls == [1]
+    assert await redis_cache.get_instances_from_cache(KEY, Item) == fresh
+    assert await redis_cache.acquire_lease(KEY)
+
+
+async def test_busy_lease_serves_stale(redis_cache):
+    """При занятой аренде отдается устаревшее значение без загрузки."""
+    stale = CacheEntry([Item(uuid=uuid4(), title="stale")], expire_at=0)
+    loader, calls = make_loader([Item(uuid=uuid4(), title="fresh")])
+    assert await redis_cache.acquire_lease(KEY)
+    result = await make_service(redis_cache)._load_to_cache(
+        KEY, loader, Item, TTL, stale
+    )
+    assert result == stale.instances
+    assert calls == []
+
+
+async def test_busy_lease_waits_for_fresh(redis_cache, monkeypatch):
+    """При промахе и занятой аренде дожидается значения владельца."""
+    monkeypatch.setattr(settings, "CACHE_LEASE_WAIT_MS", 1000)
+    monkeypatch.setattr(settings, "CACHE_LEASE_POLL_MS", 10)
+    fresh = [Item(uuid=uuid4(), title="fresh")]
+    loader, calls = make_loader(fresh)
+    assert await redis_cache.acquire_lease(KEY)
+
+    async def owner():
+        await asyncio.sleep(0.05)
+        await redis_cache.put_instances_to_cache(KEY, fresh, TTL)
+
+    result, _ = await asyncio.gather(
+        make_service(redis_cache)._load_to_cache(KEY, loader, Item, TTL),
+        owner(),
+    )
+    assert result == fresh
+    assert calls == []
+
+
+async def test_busy_lease_timeout_loads(redis_cache, monkeypatch):
+    """Не дождавшись владельца аренды, воркер загружает значение сам."""
+    monkeypatch.setattr(settings, "CACHE_LEASE_WAIT_MS", 50)
+    monkeypatch.setattr(settings, "CACHE_LEASE_POLL_MS", 10)
+    fresh = [Item(uuid=uuid4(), title="fresh")]
+    loader, calls = make_loader(fresh)
+    assert await redis_cache.acquire_lease(KEY)
+    result = await make_service(redis_cache)._load_to_cache(
+        KEY, loader, Item, TTL
+    )
+    assert result == fresh
+    assert calls == [1]
+
+
+class HeldQueue:
+    """Очередь записи, которая ничего не сохраняет (запись застряла)."""
+
+    def __init__(self) -> None:
+        self.keys: list[str] = []
+
+    async def put(self, cache, key, instances, ttl, delta=0.0) -> None:
+        self.keys.append(key)
+
+
+async def test_lease_owner_write_skips_queue(redis_cache, monkeypatch):
+    """Пока очередь держит записи, второй воркер при промахе дожидается
+    значения владельца аренды, а не загружает его сам.
+    """
+    monkeypatch.setattr(settings, "CACHE_LEASE_WAIT_MS", 1000)
+    monkeypatch.setattr(settings, "CACHE_LEASE_POLL_MS", 10)
+    queue = HeldQueue()
+    monkeypatch.setattr(core.service, "cache_writer", queue)
+    fresh = [Item(uuid=uuid4(), title="fresh")]
+    release = asyncio.Event()
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await release.wait()
+        return fresh
+
+    first = asyncio.create_task(
+        make_service(redis_cache)._load_to_cache(KEY, loader, Item, TTL)
+    )
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(
+        make_service(redis_cache)._load_to_cache(KEY, loader, Item, TTL)
+    )
+    await asyncio.sleep(0.05)
+    release.set()
+    assert await asyncio.gather(first, second) == [fresh, fresh]
+    assert calls == [1]
+    assert queue.keys == []
@@ -0,0 +1,72 @@
+"""Тесты локального кэша первого уровня."""
+from core.local_cache import LocalLRUCache
+
+
+def test_evicts_least_recently_used_by_entries(clock):
+    """При превышении числа записей вытесняется самая давняя."""
+    cache = LocalLRUCache(max_entries=2, max_bytes=1000, ttl=60)
+    cache.put("a", 1, size=1)
+    cache.put("b", 2, size=1)
+    assert cache.get("a") == 1
+    cache.put("c", 3, size=1)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+    assert cache.evictions == 1
+
+
+def test_evicts_by_bytes(clock):
+    """При превышении суммарного размера вытесняются старые записи."""
+    cache = LocalLRUCache(max_entries=10, max_bytes=10, ttl=60)
+    cache.put("a", 1, size=4)
+    cache.put("b", 2, size=4)
+    cache.put("c", 3, size=4)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.size_bytes == 8
+    assert cache.evictions == 1
+
+
+def test_skips_values_larger_than_limit(clock):
+    """Значение крупнее max_bytes не кэшируется и ничего не вытесняет."""
+    cache = LocalLRUCache(max_entries=10, max_bytes=10, ttl=60)
+    cache.put("a", 1, size=4)
+    cache.put("big", 2, size=11)
+    assert cache.get("big") is None
+    assert cache.get("a") == 1
+    assert cache.size_bytes == 4
+
+
+def test_replace_updates_size(clock):
+    """Повторная запись по ключу не удваивает учтённый размер."""
+    cache = LocalLRUCache(max_entries=10, max_bytes=10, ttl=60)
+    cache.put("a", 1, size=4)
+    cache.put("a", 2, size=6)
+    assert cache.get("a") == 2
+    assert cache.size_bytes == 6
+    assert len(cache) == 1
+
+
+def test_ttl_expiry(clock):
+    """Запись с истёкшим временем жизни не отдаётся и удаляется."""
+    cache = LocalLRUCache(max_entries=10, max_bytes=100, ttl=5)
+    cache.put("a", 1, size=3)
+    clock.advance(4.9)
+    assert cache.get("a") == 1
+    clock.advance(0.1)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.size_bytes == 0
+
+
+def test_delete_and_clear(clock):
+    """delete и clear освобождают учтённый размер."""
+    cache = LocalLRUCache(max_entries=10, max_bytes=100, ttl=60)
+    cache.put("a", 1, size=3)
+    cache.put("b", 2, size=5)
+    cache.delete("a")
+    assert cache.size_bytes == 5
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size_bytes == 0
@@ -0,0 +1,110 @@
+"""Тесты кэша готовых ответов и условных GET-запросов."""
+import pytest
+from core.config import settings
+from core.response_cache import CachedResponseRoute, get_response_cache
+from db import redis as db_redis
+from fastapi import APIRouter, Request
+from fastapi.exceptions import RequestValidationError
+from starlette.requests import Request as StarletteRequest
+
+
+@pytest.fixture
+def route(redis, monkeypatch):
+    """Маршрут с кэшем ответов поверх fakeredis и счетчиком вызовов."""
+    monkeypatch.setattr(settings, "CACHE_RESPONSES", True)
+    monkeypatch.setattr(db_redis, "redis", redis)
+    get_response_cache.cache_clear()
+    router = APIRouter(route_class=CachedResponseRoute)
+    calls = []
+
+    @router.get("/items")
+    async def item_list(
+        request: Request, page_number: int = 1, page_size: int = 50
+    ) -> list[int]:
+        calls.append((page_number, page_size))
+        request.state.cache_tags = ["index:items", "list:items"]
+        return list(range(page_size))[:3]
+
+    route = router.routes[0]
+    route.calls = calls
+    yield route
+    get_response_cache.cache_clear()
+
+
+async def call(route, query: str = "", headers: dict | None = None):
+    """Вызывает обработчик маршрута и фоновые задачи ответа."""
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/items",
+        "query_string": query.encode(),
+        "headers": [
+            (name.encode(), value.encode())
+            for name, value in (headers or {}).items()
+        ],
+        "path_params": {},
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    response = await route.get_route_handler()(
+        StarletteRequest(scope, receive)
+    )
+    if response.background:
+        await response.background()
+    return response
+
+
+async def test_key_ignores_parameter_spelling(route):
+    """Параметры по умолчанию, их порядок и лишние параметры не меняют
+    ключ ответа.
+    """
+    first = await call(route, "page_number=1&page_size=50")
+    assert route.calls == [(1, 50)]
+    for query in ("page_size=50", "", "page_size=50&page_number=1&x=1"):
+        response = await call(route, query)
+        assert response.body == first.body
+    assert route.calls == [(1, 50)]
+    await call(route, "page_size=2")
+    assert route.calls == [(1, 50), (1, 2)]
+
+
+async def test_invalid_params_are_not_cached(route, redis):
+    """Запрос с ошибкой в параметрах получает ошибку валидации (422),
+    а не ответ из кэша.
+    """
+    await call(route)
+    with pytest.raises(RequestValidationError):
+        await call(route, "page_size=abc")
+    assert route.calls == [(1, 50)]
+
+
+async def test_not_modified_skips_handler(route, monkeypatch):
+    """Без кэша ответов 304 отдается по сохраненному ETag, не вызывая
+    обработчик, а тело ответа в Redis не хранится.
+    """
+    monkeypatch.setattr(settings, "CACHE_RESPONSES", False)
+    first = await call(route)
+    etag = first.headers["etag"]
+    response = await call(route, headers={"if-none-match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert route.calls == [(1, 50)]
+
+    response = await call(route, headers={"if-none-match": '"other"'})
+    assert response.status_code == 200
+    assert response.body == first.body
+    assert route.calls == [(1, 50), (1, 50)]
+    await call(route)
+    assert route.calls == [(1, 50), (1, 50), (1, 50)]
+
+
+async def test_not_modified_without_stored_etags(route, monkeypatch):
+    """С выключенным CACHE_RESPONSE_ETAGS 304 собирается из ответа."""
+    monkeypatch.setattr(settings, "CACHE_RESPONSES", False)
+    monkeypatch.setattr(settings, "CACHE_RESPONSE_ETAGS", False)
+    etag = (await call(route)).headers["etag"]
+    response = await call(route, headers={"if-none-match": etag})
+    assert response.status_code == 304
+    assert route.calls == [(1, 50), (1, 50)]
@@ -0,0 +1,108 @@
+"""Тесты объединения одновременных запросов."""
+import asyncio
+
+import pytest
+from core.singleflight import SingleFlight
+
+
+async def test_coalesces_concurrent_calls():
+    """Одновременные вызовы с одним ключом выполняют функцию один раз."""
+    flight = SingleFlight("test")
+    calls = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "value"
+
+    waiters = [asyncio.create_task(flight.do("key", load)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    assert await asyncio.gather(*waiters) == ["value"] * 5
+    assert calls == 1
+
+
+async def test_different_keys_are_not_coalesced():
+    """Вызовы с разными ключами выполняются независимо."""
+    flight = SingleFlight("test")
+    calls = []
+
+    async def load(key):
+        calls.append(key)
+        await asyncio.sleep(0)
+        return key
+
+    results = await asyncio.gather(
+        flight.do("a", lambda: load("a")), flight.do("b", lambda: load("b"))
+    )
+    assert results == ["a", "b"]
+    assert sorted(calls) == ["a", "b"]
+
+
+async def test_error_propagates_to_all_waiters():
+    """Исключение получают все ожидающие, следующий вызов повторяет его."""
+    flight = SingleFlight("test")
+    calls = 0
+    release = asyncio.Event()
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        raise ValueError("boom")
+
+    waiters = [asyncio.create_task(flight.do("key", load)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+    assert calls == 1
+    with pytest.raises(ValueError):
+        await flight.do("key", load)
+    assert calls == 2
+
+
+async def test_leader_cancel_keeps_call_for_other_waiters():
+    """Отмена первого вызвавшего не отменяет вычисление для остальных."""
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def load():
+        await release.wait()
+        return "value"
+
+    leader = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", load))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await follower == "value"
+    assert leader.cancelled()
+
+
+async def test_last_waiter_cancel_cancels_call():
+    """Если результата больше никто не ждет, вычисление отменяется."""
+    flight = SingleFlight("test")
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def load():
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(flight.do("key", load))
+    await started.wait()
+    waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), timeout=1)
+    await asyncio.sleep(0)
+    assert await flight.do("key", lambda: asyncio.sleep(0, "again")) == (
+        "again"
+    )
@@ -0,0 +1,114 @@
+"""Тесты политики TTL записей кэша."""
+import pytest
+from core.config import CacheTTL, settings
+from core.ttl_policy import KeyClass, TTLPolicy
+
+
+def test_describe_lists_table_classes(monkeypatch):
+    """Классы из таблицы настроек видны до первого обращения."""
+    monkeypatch.setattr(
+        settings,
+        "CACHE_TTL_BY_ENDPOINT",
+        {"film_details": CacheTTL(soft=10, hard=20)},
+    )
+    monkeypatch.setattr(
+        settings, "CACHE_TTL_BY_INDEX", {"genres": CacheTTL(soft=30, hard=40)}
+    )
+    rows = {row["key_class"]: row for row in TTLPolicy().describe()}
+    assert rows.keys() == {"film_details", "genres"}
+    assert rows["film_details"]["source"] == "endpoint"
+    assert rows["film_details"]["base"] == CacheTTL(soft=10, hard=20)
+    assert rows["film_details"]["index"] is None
+    assert rows["genres"]["source"] == "index"
+    assert rows["genres"]["index"] == "genres"
+
+
+def test_served_classes_are_added(monkeypatch):
+    """Обслуженные классы добавляются, индекс эндпоинта из таблицы
+    становится известен с первого обращения.
+    """
+    monkeypatch.setattr(
+        settings,
+        "CACHE_TTL_BY_ENDPOINT",
+        {"film_details": CacheTTL(soft=10, hard=20)},
+    )
+    monkeypatch.setattr(settings, "CACHE_TTL_BY_INDEX", {})
+    policy = TTLPolicy()
+    assert policy.ttl("film_details", "movies") == CacheTTL(soft=10, hard=20)
+    policy.record("person_details", "persons", hits=1)
+    rows = {row["key_class"]: row for row in policy.describe()}
+    assert rows["film_details"]["index"] == "movies"
+    assert rows["person_details"]["source"] == "default"
+    assert rows["person_details"]["hits"] == 1
+
+
+BASE = CacheTTL(soft=100, hard=160)
+
+
+@pytest.fixture
+def adaptive(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_TTL_ADAPTIVE", True)
+    monkeypatch.setattr(settings, "CACHE_TTL_ADAPTIVE_MIN_HITS", 10)
+    monkeypatch.setattr(settings, "CACHE_TTL_ADAPTIVE_MIN_FACTOR", 0.25)
+    monkeypatch.setattr(settings, "CACHE_TTL_ADAPTIVE_MAX_FACTOR", 8.0)
+
+
+def test_adapt_halves_on_change_down_to_min_factor(adaptive):
+    """Изменения индекса уменьшают TTL вдвое, но не ниже MIN_FACTOR."""
+    key_class = KeyClass("film_details", "endpoint", "movies", BASE)
+    softs = []
+    for _ in range(4):
+        key_class.adapt(changes=1)
+        softs.append(key_class.soft)
+    assert softs == [50, 25, 25, 25]
+
+
+def test_adapt_doubles_on_hits_up_to_max_factor(adaptive):
+    """Без изменений и с достаточными попаданиями TTL удваивается,
+    но не выше MAX_FACTOR.
+    """
+    key_class = KeyClass("film_details", "endpoint", "movies", BASE)
+    softs = []
+    for _ in range(5):
+        key_class.hits = 10
+        key_class.adapt(changes=0)
+        softs.append(key_class.soft)
+    assert softs == [200, 400, 800, 800, 800]
+
+
+def test_adapt_returns_to_base_and_keeps_stale_window(adaptive):
+    """Без изменений и попаданий TTL возвращается к таблице, а время
+    хранения устаревшей записи не меняется.
+    """
+    key_class = KeyClass("film_details", "endpoint", "movies", BASE)
+    key_class.hits = 10
+    key_class.adapt(changes=0)
+    assert key_class.ttl == CacheTTL(soft=200, hard=260)
+    key_class.hits, key_class.misses = 3, 2
+    key_class.adapt(changes=0)
+    assert key_class.ttl == BASE
+    assert (key_class.last_hits, key_class.last_misses) == (3, 2)
+    assert (key_class.hits, key_class.misses) == (0, 0)
+
+
+async def test_policy_adapts_by_changes_in_redis(adaptive, redis, monkeypatch):
+    """Изменения индекса, учтенные в Redis, уменьшают TTL только
+    классов этого индекса.
+    """
+    monkeypatch.setattr(settings, "CACHE_TTL_BY_ENDPOINT", {})
+    monkeypatch.setattr(settings, "CACHE_TTL_BY_INDEX", {})
+    monkeypatch.setattr(settings, "CACHE_EXPIRE_IN_SECONDS", 100)
+    policy = TTLPolicy()
+    await policy.start(redis)
+    try:
+        policy.record("film_details", "movies", hits=10)
+        policy.record("person_details", "persons", hits=10)
+        await policy.record_change("movies")
+        await policy.adapt()
+        assert policy.ttl("film_details", "movies").soft == 50
+        assert policy.ttl("person_details", "persons").soft == 200
+        rows = {row["key_class"]: row for row in policy.describe()}
+        assert rows["film_details"]["last_changes"] == 1
+        assert rows["person_details"]["last_hits"] == 10
+    finally:
+        await policy.stop()
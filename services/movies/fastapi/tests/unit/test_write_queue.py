@@ -0,0 +1,126 @@
+"""Тесты фоновой очереди записи в кэш."""
+import asyncio
+
+import pytest
+from core import write_queue
+from core.config import CacheTTL, settings
+from core.metrics import metrics
+from core.write_queue import CacheWriteQueue
+
+TTL = CacheTTL(soft=60, hard=120)
+
+
+class FakeCache:
+    """Кэш, запоминающий сохраненные ключи. Пока gate не открыт,
+    сохранение не завершается.
+    """
+
+    def __init__(self) -> None:
+        self.started: list[str] = []
+        self.calls: list[list[str]] = []
+        self.gate = asyncio.Event()
+
+    @property
+    def written(self) -> list[str]:
+        return [key for call in self.calls for key in call]
+
+    async def put_many_to_cache(self, items, ttl, deltas=None) -> None:
+        self.started.extend(items)
+        await self.gate.wait()
+        self.calls.append(list(items))
+
+
+@pytest.fixture
+async def queue(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_WRITE_QUEUE_SIZE", 2)
+    monkeypatch.setattr(settings, "CACHE_WRITE_FLUSH_TIMEOUT_MS", 1000)
+    writer = CacheWriteQueue()
+    writer.start()
+    yield writer
+    await writer.stop()
+
+
+async def settle() -> None:
+    """Дает фоновой задаче дойти до сохранения в кэш."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def fill(queue: CacheWriteQueue, cache: FakeCache) -> None:
+    """Занимает фоновую задачу записью k1 и заполняет очередь k2, k3."""
+    await queue.put(cache, "k1", [], TTL)
+    await settle()
+    assert cache.started == ["k1"]
+    await queue.put(cache, "k2", [], TTL)
+    await queue.put(cache, "k3", [], TTL)
+
+
+async def test_drop_new(queue, monkeypatch):
+    """drop_new: при заполненной очереди новая запись отбрасывается."""
+    monkeypatch.setattr(settings, "CACHE_WRITE_DROP_POLICY", "drop_new")
+    cache = FakeCache()
+    await fill(queue, cache)
+    await queue.put(cache, "k4", [], TTL)
+    cache.gate.set()
+    await queue.stop()
+    assert cache.written == ["k1", "k2", "k3"]
+
+
+async def test_drop_oldest(queue, monkeypatch):
+    """drop_oldest: отбрасывается самая старая запись из очереди."""
+    monkeypatch.setattr(settings, "CACHE_WRITE_DROP_POLICY", "drop_oldest")
+    cache = FakeCache()
+    await fill(queue, cache)
+    await queue.put(cache, "k4", [], TTL)
+    cache.gate.set()
+    await queue.stop()
+    assert cache.written == ["k1", "k3", "k4"]
+
+
+async def test_write_through(queue, monkeypatch):
+    """write_through: новая запись сохраняется сразу, минуя очередь."""
+    monkeypatch.setattr(settings, "CACHE_WRITE_DROP_POLICY", "write_through")
+    cache = FakeCache()
+    await fill(queue, cache)
+    write = asyncio.create_task(queue.put(cache, "k4", [], TTL))
+    await settle()
+    assert cache.started == ["k1", "k4"]
+    cache.gate.set()
+    await write
+    await queue.stop()
+    assert sorted(cache.written) == ["k1", "k2", "k3", "k4"]
+
+
+async def test_stop_flushes_queue(queue):
+    """stop дописывает очередь, записи одного TTL уходят одним пакетом."""
+    cache = FakeCache()
+    await fill(queue, cache)
+    cache.gate.set()
+    await queue.stop()
+    assert not queue.running
+    assert cache.calls == [["k1"], ["k2", "k3"]]
+
+
+async def test_stop_gives_up_after_timeout(queue, monkeypatch):
+    """Если кэш не отвечает, stop ждет не дольше
+    CACHE_WRITE_FLUSH_TIMEOUT_MS и отбрасывает остаток очереди.
+    """
+    monkeypatch.setattr(settings, "CACHE_WRITE_FLUSH_TIMEOUT_MS", 50)
+    errors = []
+    monkeypatch.setattr(write_queue.logger, "error", errors.append)
+    cache = FakeCache()
+    await fill(queue, cache)
+    dropped = metrics.snapshot().get("cache.write.dropped", 0)
+    await asyncio.wait_for(queue.stop(), timeout=1)
+    assert not queue.running
+    assert cache.written == []
+    assert metrics.snapshot()["cache.write.dropped"] == dropped + 2
+    assert errors == ["Не дописано в кэш при остановке: 2"]
+
+
+async def test_writes_directly_when_stopped():
+    """Без фоновой задачи запись сохраняется сразу."""
+    cache = FakeCache()
+    cache.gate.set()
+    await CacheWriteQueue().put(cache, "k1", [], TTL)
+    assert cache.written == ["k1"]
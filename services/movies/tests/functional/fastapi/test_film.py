@@ -1,7 +1,9 @@
+import json
 from http import HTTPStatus
 
 import pytest
-from functional.settings import IndexName
+from aiohttp import ClientSession
+from functional.settings import IndexName, test_settings
 from functional.testdata.film_data import (
     FILM,
     GENRE_PARAM,
@@ -138,6 +140,69 @@ async def test_film_list_pagination(
     assert len(response["body"]) == expected_response["length"]
 
 
+async def test_film_list_cursor(es_load, make_get_request):
+    """Проверяем выдачу по курсору: фильмы с равным рейтингом идут
+    без пропусков и повторов в том же порядке, что и по номерам страниц.
+    """
+
+    film_data_in = get_films_to_load(75)
+    endpoint = "/api/v1/films"
+
+    await es_load(INDEX_NAME, film_data_in)
+    response = await make_get_request(endpoint, {"page_size": 1000})
+    expected = [film["uuid"] for film in response["body"]]
+
+    uuids = []
+    params = {"page_size": 20}
+    while True:
+        response = await make_get_request(endpoint, params)
+        assert response["status"] == HTTPStatus.OK
+        uuids.extend(film["uuid"] for film in response["body"])
+        cursor = response["headers"].get("X-Next-Cursor")
+        if not cursor:
+            break
+        params = {"page_size": 20, "cursor": cursor}
+    assert uuids == expected
+
+    response = await make_get_request(endpoint, {"cursor": "invalid"})
+    assert response["status"] == HTTPStatus.BAD_REQUEST
+    response = await make_get_request(endpoint, {"page_size": 1001})
+    assert response["status"] == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+async def test_film_export(es_load, a_client: ClientSession):
+    """Проверяем выгрузку всех фильмов в NDJSON: целиком и по части полей
+    со сжатием gzip (aiohttp распаковывает ответ сам).
+    """
+
+    film_data_in = get_films_to_load(75)
+    url = f"{test_settings.app_url}/api/v1/films/export"
+
+    await es_load(INDEX_NAME, film_data_in)
+    async with a_client.get(
+        url, headers={"Accept-Encoding": "identity"}
+    ) as resp:
+        assert resp.status == HTTPStatus.OK
+        assert resp.content_type == "application/x-ndjson"
+        films = [json.loads(line) for line in (await resp.text()).splitlines()]
+    assert {film["uuid"] for film in films} == {
+        film["uuid"] for film in film_data_in
+    }
+
+    async with a_client.get(
+        url,
+        params={"fields": "uuid,title"},
+        headers={"Accept-Encoding": "gzip"},
+    ) as resp:
+        assert resp.headers["Content-Encoding"] == "gzip"
+        films = [json.loads(line) for line in (await resp.text()).splitlines()]
+    assert len(films) == 75
+    assert all(set(film) == {"uuid", "title"} for film in films)
+
+    async with a_client.get(url, params={"fields": "uuid,unknown"}) as resp:
+        assert resp.status == HTTPStatus.BAD_REQUEST
+
+
 async def test_film_list_cache(
     es_load,
     make_get_request,
@@ -173,3 +238,144 @@ async def test_film_list_cache(
     response = await make_get_request(endpoint, params)
 
     assert len(response["body"]) == length_films + add_number
+
+
+async def test_film_list_cache_status(
+    es_load,
+    make_get_request,
+):
+    """Проверяем заголовок X-Cache с результатом обращения к кэшу."""
+
+    film_data_in = get_films_to_load(10)
+    endpoint = "/api/v1/films"
+
+    await es_load(INDEX_NAME, film_data_in)
+    response = await make_get_request(endpoint)
+    assert response["status"] == HTTPStatus.OK
+    assert response["headers"]["X-Cache"] == "MISS"
+
+    response = await make_get_request(endpoint)
+    assert response["status"] == HTTPStatus.OK
+    assert response["headers"]["X-Cache"] == "HIT"
+
+
+async def test_film_not_found_negative_cache(
+    es_load,
+    make_get_request,
+):
+    """Проверяем, что повторный 404 отдается из негативного кэша."""
+
+    film_data_in = get_films_to_load(1)
+    endpoint = "/api/v1/films/00000000-0000-0000-0000-000000000000"
+
+    await es_load(INDEX_NAME, film_data_in)
+    response = await make_get_request(endpoint)
+    assert response["status"] == HTTPStatus.NOT_FOUND
+    assert response["headers"]["X-Cache"] == "MISS"
+
+    response = await make_get_request(endpoint)
+    assert response["status"] == HTTPStatus.NOT_FOUND
+    assert response["headers"]["X-Cache"] == "NEGATIVE"
+
+
+async def test_film_etag_not_modified(
+    es_load,
+    make_get_request,
+):
+    """Проверяем ETag и ответ 304 на запрос с совпавшим If-None-Match."""
+
+    film_data_in = get_films_to_load(10)
+    endpoint = "/api/v1/films"
+
+    await es_load(INDEX_NAME, film_data_in)
+    response = await make_get_request(endpoint)
+    assert response["status"] == HTTPStatus.OK
+    etag = response["headers"]["ETag"]
+    assert response["headers"]["Cache-Control"].startswith("max-age=")
+
+    response = await make_get_request(
+        endpoint, headers={"If-None-Match": etag}
+    )
+    assert response["status"] == HTTPStatus.NOT_MODIFIED
+    assert response["headers"]["ETag"] == etag
+
+
+async def test_film_surrogate_keys_purge(
+    es_load,
+    make_get_request,
+    make_post_request,
+):
+    """Проверяем заголовки для прокси и рассылку purge по UUID фильма."""
+
+    film_data_in = get_films_to_load(1)
+    film_uuid = film_data_in[0]["uuid"]
+
+    await es_load(INDEX_NAME, film_data_in)
+    response = await make_get_request(f"/api/v1/films/{film_uuid}")
+    assert response["status"] == HTTPStatus.OK
+    assert set(response["headers"]["Surrogate-Key"].split()) == {
+        f"index:{INDEX_NAME}",
+        f"doc:{film_uuid}",
+    }
+    assert response["headers"]["Surrogate-Control"].startswith("max-age=")
+
+    response = await make_post_request(
+        "/api/internal/edge/purge", {"uuids": [film_uuid]}
+    )
+    assert response["status"] == HTTPStatus.OK
+    assert response["body"] == {
+        "keys": [f"doc:{film_uuid}"],
+        "purged": {"local": True},
+    }
+
+    response = await make_get_request("/api/internal/edge/local")
+    assert response["body"][-1] == [f"doc:{film_uuid}"]
+
+
+async def test_film_batch_order(
+    es_load,
+    make_post_request,
+):
+    """Проверяем выдачу фильмов по списку UUID в порядке запроса."""
+
+    film_data_in = get_films_to_load(5)
+    uuids = [film["uuid"] for film in reversed(film_data_in)]
+    unknown = "00000000-0000-0000-0000-000000000000"
+    endpoint = "/api/v1/films/batch"
+
+    await es_load(INDEX_NAME, film_data_in)
+    for _ in range(2):
+        # второй раз фильмы берутся из кэша документов
+        response = await make_post_request(
+            endpoint, {"uuids": [uuids[0], unknown, *uuids[1:]]}
+        )
+        assert response["status"] == HTTPStatus.OK
+        assert [film["uuid"] for film in response["body"]] == uuids
+
+    response = await make_post_request(endpoint, {"uuids": [unknown]})
+    assert response["status"] == HTTPStatus.NOT_FOUND
+
+    response = await make_post_request(endpoint, {"uuids": []})
+    assert response["status"] == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+async def test_film_details_after_short_list(
+    es_load,
+    make_get_request,
+):
+    """Проверяем, что короткие документы списка не подменяют в кэше
+    полный документ фильма.
+    """
+
+    film_data_in = get_films_to_load(3)
+    film = film_data_in[0]
+
+    await es_load(INDEX_NAME, film_data_in)
+    response = await make_get_request("/api/v1/films")
+    assert response["status"] == HTTPStatus.OK
+    assert set(response["body"][0]) == {"uuid", "title", "imdb_rating"}
+
+    response = await make_get_request(f"/api/v1/films/{film['uuid']}")
+    assert response["status"] == HTTPStatus.OK
+    assert response["body"]["description"] == film["description"]
+    assert response["body"]["genre"]
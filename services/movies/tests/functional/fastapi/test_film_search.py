@@ -196,3 +196,25 @@ async def test_film_search_cache(
     response = await make_get_request(endpoint, params)
 
     assert len(response["body"]) == length_films + add_number
+
+
+async def test_film_advanced_search_admission(
+    es_load,
+    make_post_request,
+):
+    """Проверяем, что страница расширенного поиска попадает в кэш
+    только со второго запроса с тем же телом.
+    """
+
+    film_data_in = get_films_to_load(20, title="admission")
+    endpoint = "/api/v1/films/advanced_search?page_size=20"
+    search_query = {"movie": {"title": "admission"}}
+
+    await es_load(INDEX_NAME, film_data_in)
+    statuses = []
+    for _ in range(3):
+        response = await make_post_request(endpoint, search_query)
+        assert response["status"] == HTTPStatus.OK
+        statuses.append(response["headers"]["X-Cache"])
+
+    assert statuses == ["MISS", "MISS", "HIT"]
@@ -70,3 +70,19 @@ async def test_genre_get_list_cache(
     await redis_client.flushall()
     response = await make_get_request(ENDPOINT)
     assert response["body"] == expected_response["body_new_value"]
+
+
+@pytest.mark.asyncio
+async def test_genre_list_ttl_policy(es_load, make_get_request):
+    """Тест TTL списка жанров из таблицы политики по индексу"""
+
+    await es_load(INDEX, genre_test_data)
+    response = await make_get_request(ENDPOINT)
+    assert response["status"] == HTTPStatus.OK
+    assert response["headers"]["Cache-Control"] == "max-age=3600"
+
+    response = await make_get_request("/api/internal/cache/ttl")
+    assert response["status"] == HTTPStatus.OK
+    policy = {row["key_class"]: row for row in response["body"]}
+    assert policy["genre_list"]["source"] == "index"
+    assert policy["genre_list"]["effective"] == {"soft": 3600, "hard": 86400}
@@ -89,3 +89,25 @@ async def test_person_by_uuid_redis(
     # Проверяем ответ после отчистки индекса и кэша.
     response = await make_get_request(endpoint)
     assert response["status"] == HTTPStatus.NOT_FOUND
+
+
+async def test_person_details_shares_entity_with_films(
+    es_load, make_get_request
+):
+    """Проверка, что персона и ее фильмы собираются из одной записи кэша:
+    после запроса персоны фильмы персоны отдаются без Elasticsearch.
+    """
+    person = persons_to_load[1]
+    endpoint = f"{ENDPOINT}{person['uuid']}"
+    await es_load(INDEX_NAME, persons_to_load)
+
+    response = await make_get_request(endpoint)
+    assert response["status"] == HTTPStatus.OK
+    assert response["headers"]["X-Cache"] == "MISS"
+
+    response = await make_get_request(f"{endpoint}/film")
+    assert response["status"] == HTTPStatus.OK
+    assert response["headers"]["X-Cache"] == "HIT"
+    assert [film["title"] for film in response["body"]] == [
+        film["title"] for film in person["films"]
+    ]
@@ -173,3 +173,27 @@ async def test_person_search_redis(
     response = await make_get_request(ENDPOINT)
     # Проверяем что ответ API содержит один фильм, т.к. из кэша
     assert len(response["body"]) == 2
+
+
+async def test_person_advanced_search_films(es_load, make_post_request):
+    """Проверка расширенного поиска персон по полям их фильмов: разные
+    фильтры по фильмам не делят между собой запись кэша.
+    """
+    endpoint = "/api/v1/persons/advanced_search?page_size=10"
+    await es_load(INDEX_NAME, persons_to_load)
+
+    response = await make_post_request(
+        endpoint, {"films": [{"title": "Moon"}]}
+    )
+    assert response["status"] == HTTPStatus.OK
+    assert [person["uuid"] for person in response["body"]] == [
+        persons_to_load[0]["uuid"]
+    ]
+
+    response = await make_post_request(
+        endpoint, {"films": [{"title": "Brightest"}]}
+    )
+    assert response["status"] == HTTPStatus.OK
+    assert [person["uuid"] for person in response["body"]] == [
+        persons_to_load[1]["uuid"]
+    ]
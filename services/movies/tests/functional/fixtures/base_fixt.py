@@ -1,4 +1,5 @@
 import asyncio
+from http import HTTPStatus
 from typing import Any, AsyncGenerator, Callable, Coroutine
 
 import pytest
@@ -31,22 +32,46 @@ async def a_client() -> AsyncGenerator[ClientSession, None]:
 @pytest.fixture
 def make_get_request(
     a_client: ClientSession,
-) -> Callable[[str, dict | None], Coroutine[Any, Any, dict[str, Any]]]:
-    """Делаем GET запрос на определенный endpoint, передавая параметры.
-    Получаем ответ.
+) -> Callable[..., Coroutine[Any, Any, dict[str, Any]]]:
+    """Делаем GET запрос на определенный endpoint, передавая параметры
+    и заголовки. Получаем ответ (у 304 Not Modified тела нет).
     """
 
     async def inner(
-        endpoint: str, params: dict | None = None
+        endpoint: str, params: dict | None = None, headers: dict | None = None
     ) -> dict[str, Any]:
         params = params or {}
         url = f"{test_settings.app_url}{endpoint}"
-        async with a_client.get(url=url, params=params) as resp:
+        async with a_client.get(
+            url=url, params=params, headers=headers
+        ) as resp:
             return {
-                "body": await resp.json(),
+                "body": (
+                    None
+                    if resp.status == HTTPStatus.NOT_MODIFIED
+                    else await resp.json()
+                ),
                 "status": resp.status,
                 "headers": resp.headers,
                 "url": resp.url,
             }
 
     return inner
+
+
+@pytest.fixture
+def make_post_request(
+    a_client: ClientSession,
+) -> Callable[..., Coroutine[Any, Any, dict[str, Any]]]:
+    """Делаем POST запрос с JSON телом на определенный endpoint."""
+
+    async def inner(endpoint: str, data: Any) -> dict[str, Any]:
+        url = f"{test_settings.app_url}{endpoint}"
+        async with a_client.post(url=url, json=data) as resp:
+            return {
+                "body": await resp.json(),
+                "status": resp.status,
+                "headers": resp.headers,
+            }
+
+    return inner
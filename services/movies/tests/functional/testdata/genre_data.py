@@ -17,9 +17,10 @@ genre_test_data = [
 ]
 
 
+# без заданной сортировки жанры идут по uuid
 genre_test_response_data = [
-    {"uuid": "3d8d9bf5-0d90-4353-88ba-4ccc5d2c07ff", "name": "Action"},
     {"uuid": "120a21cf-9097-479e-904a-13dd7198c1dd", "name": "Adventure"},
+    {"uuid": "3d8d9bf5-0d90-4353-88ba-4ccc5d2c07ff", "name": "Action"},
     {"uuid": "b92ef010-5e4c-4fd0-99d6-41b6456272cd", "name": "Fantasy"},
 ]
 
@@ -33,6 +34,6 @@ genre_test_modify = [
 
 genre_test_response_modified = [
     {"uuid": "120a21cf-9097-479e-904a-13dd7198c1dd", "name": "Adventure"},
-    {"uuid": "b92ef010-5e4c-4fd0-99d6-41b6456272cd", "name": "Fantasy"},
     {"uuid": "3d8d9bf5-0d90-4353-88ba-4ccc5d2c07ff", "name": "New value"},
+    {"uuid": "b92ef010-5e4c-4fd0-99d6-41b6456272cd", "name": "Fantasy"},
 ]
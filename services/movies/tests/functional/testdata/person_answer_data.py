@@ -8,14 +8,8 @@ person_by_uuid = {
 }
 
 
+# без запроса персоны идут по uuid
 person_all = [
-    {
-        "uuid": "c2c5bd13-211a-446c-bc67-3eae19c35cf0",
-        "full_name": "Yuen Chor",
-        "films": [
-            {"uuid": "edeaa714-5ee5-4032-b1cf-fe8b0e8a2cfa", "roles": "writer"}
-        ],
-    },
     {
         "uuid": "92a0829a-2db9-44e3-9628-517dddc09ca6",
         "full_name": "Desi Arnaz",
@@ -24,6 +18,13 @@ person_all = [
             {"uuid": "9ad55eb5-6078-4933-b746-42f23cf6a244", "roles": "actor"},
         ],
     },
+    {
+        "uuid": "c2c5bd13-211a-446c-bc67-3eae19c35cf0",
+        "full_name": "Yuen Chor",
+        "films": [
+            {"uuid": "edeaa714-5ee5-4032-b1cf-fe8b0e8a2cfa", "roles": "writer"}
+        ],
+    },
 ]
 
 